@@ -0,0 +1,3223 @@
+import sys
+import csv
+import io
+import itertools
+import time
+import random
+import json
+import math
+import os
+import queue
+import tempfile
+import threading
+
+import zipfile
+from array import array
+from collections import deque
+
+# paho-mqtt, QtChart et reportlab sont importés à leur première utilisation :
+# la fenêtre d'accueil n'en a pas besoin et s'affiche sans attendre leur chargement.
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
+                             QLineEdit, QFormLayout, QFileDialog, QTableWidget, QTableWidgetItem, QTableView,
+                             QHeaderView, QScrollArea, QSplitter, QSlider, QSizePolicy, QProgressDialog, QCheckBox)
+from PyQt5.QtCore import (Qt, pyqtSignal, QThread, QObject, QTimer, QPointF, QRectF, QSizeF,
+                          QAbstractTableModel, QModelIndex, QBuffer, QIODevice)
+from PyQt5.QtGui import QPainter, QPen, QColor, QImage
+
+from datetime import datetime
+
+
+# Configuration des topics MQTT
+BROKER_ADDRESS = os.environ.get("COOLINGBRICK_BROKER_ADDRESS", "172.20.10.2")  # Adresse du broker MQTT
+ESP1_TOPIC_DATA = "ESP1/data"          # Topic pour l'ESP 1 (données uniquement)
+ESP2_TOPIC_DATA = "ESP2/data"     # Topic pour les données de l'ESP 2
+ESP2_TOPIC_DATATEMP = "ESP2/temp"
+ESP2_TOPIC_DATAFLOW = "ESP2/flow"
+ESP2_TOPIC_COMMAND = "ESP2/command"  # Topic pour les commandes à l'ESP 2
+
+ESP1_TOPIC_CONTROL = "ESP1/control"
+ESP2_TOPIC_CONTROL = "ESP2/control"
+
+BROKER_PORT = int(os.environ.get("COOLINGBRICK_BROKER_PORT", 1234))
+BROKER_KEEPALIVE = 60
+
+# QoS utilisée pour les messages qui ne doivent pas se perdre (START/STOP, consignes)
+COMMAND_QOS = 1
+DATA_QOS = 0
+
+
+# Instrumentation : COOLINGBRICK_METRICS=1 l'active dès le lancement, sinon
+# elle peut être activée depuis le panneau de diagnostic
+METRICS_ENABLED = os.environ.get("COOLINGBRICK_METRICS", "0") == "1"
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def add(self, amount=1):
+        self.value += amount
+
+
+class Histogram:
+    # Histogramme log-linéaire à la manière de HdrHistogram : valeurs entières en
+    # microsecondes, 32 intervalles par puissance de deux (erreur relative < 3,2 %),
+    # mémoire fixe et enregistrement en O(1). Pas de verrou : une mise à jour perdue
+    # lors d'une course entre threads est sans conséquence pour du diagnostic.
+    SUB_BUCKET_BITS = 5
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    BUCKET_COUNT = (65 - SUB_BUCKET_BITS) * SUB_BUCKETS
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, seconds):
+        value = max(int(seconds * 1e6), 0)
+        if value < self.SUB_BUCKETS:
+            index = value
+        else:
+            length = value.bit_length()
+            index = (length - self.SUB_BUCKET_BITS) * self.SUB_BUCKETS + (value >> (length - self.SUB_BUCKET_BITS - 1)) - self.SUB_BUCKETS
+        self.counts[index] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def bucket_bounds(self, index):
+        if index < 2 * self.SUB_BUCKETS:
+            return index, index + 1
+        length = index // self.SUB_BUCKETS + self.SUB_BUCKET_BITS
+        width = 1 << (length - self.SUB_BUCKET_BITS - 1)
+        lower = (self.SUB_BUCKETS + index % self.SUB_BUCKETS) * width
+        return lower, lower + width
+
+    def percentile(self, percentile):
+        # Milieu de l'intervalle contenant le percentile, en microsecondes
+        if not self.count:
+            return None
+        target = max(math.ceil(percentile / 100 * self.count), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                lower, upper = self.bucket_bounds(index)
+                return min(max((lower + upper - 1) / 2, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        summary = {
+            "count": self.count,
+            "mean_ms": self.total / self.count / 1000,
+            "min_ms": self.min / 1000,
+        }
+        for percentile in (50, 90, 99):
+            summary[f"p{percentile}_ms"] = self.percentile(percentile) / 1000
+        summary["max_ms"] = self.max / 1000
+        return summary
+
+
+class Metrics:
+    # Registre des compteurs et histogrammes de l'application. Les appelants testent
+    # METRICS.enabled avant de mesurer : désactivée, l'instrumentation ne coûte que ce test.
+    # Les sources sont des fonctions renvoyant un dict, lues seulement lors d'un snapshot.
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        self.sources = {}
+        self.started_at = time.time()
+
+    def counter(self, name):
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters.setdefault(name, Counter())
+        return counter
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def add_source(self, name, callback):
+        self.sources[name] = callback
+
+    def remove_source(self, name):
+        self.sources.pop(name, None)
+
+    def reset(self):
+        # Remise à zéro sur place : les appelants gardent leurs références
+        for counter in list(self.counters.values()):
+            counter.value = 0
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+        self.started_at = time.time()
+
+    def snapshot(self):
+        sources = {}
+        for name, callback in sorted(self.sources.items()):
+            try:
+                sources[name] = callback()
+            except Exception as e:
+                sources[name] = {"error": str(e)}
+        now = time.time()
+        return {
+            "enabled": self.enabled,
+            "time": now,
+            "elapsed": now - self.started_at,
+            "counters": {name: counter.value for name, counter in sorted(self.counters.items())},
+            "histograms": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+            "sources": sources,
+        }
+
+    def dump(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+
+METRICS = Metrics(METRICS_ENABLED)
+
+
+class MqttService:
+    # Connexion MQTT unique et partagée par toute l'application.
+    # Les abonnements sont multiplexés vers plusieurs listeners et les
+    # publications sont mises en file d'attente pendant les reconnexions.
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    MAX_PENDING_PUBLISHES = 1000
+    LATENCY_WINDOW = 200
+
+    @classmethod
+    def instance(cls, broker_address=None, port=None):
+        broker_address = broker_address or BROKER_ADDRESS
+        port = port or BROKER_PORT
+        with cls._instances_lock:
+            service = cls._instances.get((broker_address, port))
+            if service is None:
+                service = cls(broker_address, port)
+                cls._instances[(broker_address, port)] = service
+            return service
+
+    @classmethod
+    def shutdown_all(cls):
+        with cls._instances_lock:
+            services = list(cls._instances.values())
+            cls._instances.clear()
+        for service in services:
+            service.stop()
+
+    def __init__(self, broker_address, port=BROKER_PORT, keepalive=BROKER_KEEPALIVE):
+        self.broker_address = broker_address
+        self.port = port
+        self.keepalive = keepalive
+
+        self._lock = threading.RLock()
+        self._listeners = {}       # topic -> [callback, ...]
+        self._topic_qos = {}       # topic -> qos
+        self._pending = deque(maxlen=self.MAX_PENDING_PUBLISHES)
+        self._inflight = {}        # mid -> heure d'envoi
+        self._acked_early = {}     # mid -> heure d'acquittement reçu avant la fin de publish()
+        self._connected = False
+        self._started = False
+
+        self.publish_count = 0
+        self.dropped_publishes = 0
+        self.connect_count = 0
+        self.reconnect_count = 0
+        self.publish_latencies = deque(maxlen=self.LATENCY_WINDOW)
+
+        import paho.mqtt.client as mqtt  # Bibliothèque MQTT, chargée à la première connexion
+        self.mqtt = mqtt
+        self.client = mqtt.Client()
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_message = self.on_message
+        self.client.on_publish = self.on_publish
+        self.client.reconnect_delay_set(min_delay=1, max_delay=30)
+        METRICS.add_source(f"mqtt {broker_address}:{port}", self.stats)
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        # connect_async ne bloque pas l'interface : la connexion et les
+        # reconnexions sont gérées par le thread réseau de paho
+        self.client.connect_async(self.broker_address, self.port, self.keepalive)
+        self.client.loop_start()
+
+    def stop(self):
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            self._connected = False
+        self.client.disconnect()
+        self.client.loop_stop()
+        METRICS.remove_source(f"mqtt {self.broker_address}:{self.port}")
+
+    def is_connected(self):
+        return self._connected
+
+    # Les appels au client paho sont faits hors du verrou : paho appelle nos
+    # callbacks en tenant ses propres verrous, ce qui pourrait créer un interblocage.
+    def subscribe(self, topic, callback, qos=DATA_QOS):
+        with self._lock:
+            listeners = self._listeners.setdefault(topic, [])
+            first_listener = not listeners
+            listeners.append(callback)
+            send_subscribe = first_listener or qos > self._topic_qos.get(topic, 0)
+            if send_subscribe:
+                self._topic_qos[topic] = qos
+            send_subscribe = send_subscribe and self._connected
+        if send_subscribe:
+            self.client.subscribe(topic, qos)
+        self.start()
+
+    def unsubscribe(self, topic, callback):
+        with self._lock:
+            listeners = self._listeners.get(topic)
+            if not listeners or callback not in listeners:
+                return
+            listeners.remove(callback)
+            send_unsubscribe = not listeners
+            if send_unsubscribe:
+                del self._listeners[topic]
+                del self._topic_qos[topic]
+            send_unsubscribe = send_unsubscribe and self._connected
+        if send_unsubscribe:
+            self.client.unsubscribe(topic)
+
+    def publish(self, topic, payload, qos=DATA_QOS, retain=False):
+        with self._lock:
+            connected = self._connected
+            if not connected:
+                if len(self._pending) == self._pending.maxlen:
+                    self.dropped_publishes += 1
+                self._pending.append((topic, payload, qos, retain))
+        if connected:
+            self._send(topic, payload, qos, retain)
+        else:
+            self.start()
+
+    def _send(self, topic, payload, qos, retain):
+        sent_at = time.perf_counter()
+        info = self.client.publish(topic, payload, qos, retain)
+        if info.rc != self.mqtt.MQTT_ERR_SUCCESS and (qos == 0 or info.rc != self.mqtt.MQTT_ERR_NO_CONN):
+            # La connexion vient de tomber : on garde le message pour la reconnexion.
+            # En QoS >= 1, paho l'a déjà conservé et le renverra lui-même à la reconnexion.
+            with self._lock:
+                self._pending.appendleft((topic, payload, qos, retain))
+            return False
+        with self._lock:
+            self.publish_count += 1
+            # Le thread réseau de paho peut appeler on_publish avant que publish() ne rende la main
+            acked_at = self._acked_early.pop(info.mid, None)
+            if acked_at is not None:
+                self.publish_latencies.append(acked_at - sent_at)
+            else:
+                self._inflight[info.mid] = sent_at
+        return True
+
+    def on_connect(self, client, userdata, flags, rc):
+        if rc != 0:
+            print(f"MQTT connection to {self.broker_address} refused (rc={rc})")
+            return
+        print(f"Connected to MQTT broker at {self.broker_address}")
+        with self._lock:
+            self._connected = True
+            self.connect_count += 1
+            if self.connect_count > 1:
+                self.reconnect_count += 1
+            subscriptions = list(self._topic_qos.items())
+            pending = list(self._pending)
+            self._pending.clear()
+        for topic, qos in subscriptions:
+            self.client.subscribe(topic, qos)
+        for index, message in enumerate(pending):
+            if not self._send(*message):
+                with self._lock:
+                    self._pending.extend(pending[index + 1:])
+                break
+
+    def on_disconnect(self, client, userdata, rc):
+        with self._lock:
+            self._connected = False
+            self._inflight.clear()
+            self._acked_early.clear()
+        if rc != 0:
+            print(f"Lost connection to MQTT broker at {self.broker_address} (rc={rc}), reconnecting")
+
+    def on_publish(self, client, userdata, mid):
+        acked_at = time.perf_counter()
+        with self._lock:
+            sent_at = self._inflight.pop(mid, None)
+            if sent_at is not None:
+                self.publish_latencies.append(acked_at - sent_at)
+            else:
+                self._acked_early[mid] = acked_at
+
+    def on_message(self, client, userdata, msg):
+        if METRICS.enabled:
+            METRICS.counter(f"mqtt.messages:{msg.topic}").add()
+            METRICS.counter(f"mqtt.bytes:{msg.topic}").add(len(msg.payload))
+        with self._lock:
+            callbacks = [callback
+                         for topic, listeners in self._listeners.items()
+                         if self.mqtt.topic_matches_sub(topic, msg.topic)
+                         for callback in listeners]
+        for callback in callbacks:
+            try:
+                callback(msg)
+            except Exception as e:
+                print(f"Error in MQTT listener for {msg.topic}: {e}")
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self.publish_latencies)
+            return {
+                "connected": self._connected,
+                "publish_count": self.publish_count,
+                "pending_publishes": len(self._pending),
+                "dropped_publishes": self.dropped_publishes,
+                "reconnect_count": self.reconnect_count,
+                "subscriptions": len(self._listeners),
+                "publish_latency_ms_mean": 1000 * sum(latencies) / len(latencies) if latencies else None,
+                "publish_latency_ms_max": 1000 * latencies[-1] if latencies else None,
+            }
+
+
+# Cadence de rafraîchissement des graphiques et tableaux
+UI_FRAME_RATE = 25
+
+
+class SampleBuffer:
+    # File entre le thread MQTT (producteur) et le thread Qt (consommateur).
+    # deque.append et deque.popleft sont atomiques : aucun verrou n'est nécessaire.
+    def __init__(self, maxlen=None):
+        self._queue = deque(maxlen=maxlen)
+        self.pushed = 0
+
+    def push(self, item):
+        self._queue.append(item)
+        self.pushed += 1
+
+    def drain(self):
+        queue = self._queue
+        return [queue.popleft() for _ in range(len(queue))]
+
+    def depth(self):
+        return len(self._queue)
+
+
+class DataCollector(QObject):
+    data_collected = pyqtSignal(dict)
+
+    def __init__(self, broker_address, topic, buffer=None):
+        super().__init__()
+        self.broker_address = broker_address
+        self.topic = topic
+        # Avec un buffer, les échantillons sont vidés par un UiUpdatePump au lieu
+        # d'émettre un signal Qt par message
+        self.buffer = buffer
+        # Tout message reçu est journalisé dans la session du processus, quelle que
+        # soit la fenêtre qui l'affiche
+        SessionRecorder.shared()
+        self.decode_time = METRICS.histogram(f"decode.time:{topic}")
+        self.decode_errors = METRICS.counter(f"decode.errors:{topic}")
+        self.service = MqttService.instance(broker_address)
+        self.service.subscribe(self.topic, self.on_message, DATA_QOS)
+
+    def close(self):
+        self.service.unsubscribe(self.topic, self.on_message)
+
+    def on_message(self, msg):
+        measure = METRICS.enabled
+        if measure:
+            decode_start = time.perf_counter()
+        try:
+            data = json.loads(msg.payload.decode())
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            self.decode_errors.add()
+            print(f"Error decoding JSON on {msg.topic}: {e}")
+            return
+        if measure:
+            self.decode_time.record(time.perf_counter() - decode_start)
+        received_at = time.time()
+        recorder = SessionRecorder.active
+        if recorder is not None:
+            recorder.record(msg.topic, received_at, data)
+        if self.buffer is not None:
+            self.buffer.push((received_at, data))
+        else:
+            self.data_collected.emit(data)
+
+
+class UiUpdatePump(QObject):
+    # Vide les SampleBuffer à cadence fixe et transmet chaque lot à son handler,
+    # pour que les widgets soient mis à jour une fois par image et non par message.
+    stats_updated = pyqtSignal(float, int)  # images par seconde, profondeur de file
+
+    def __init__(self, frame_rate=UI_FRAME_RATE, parent=None):
+        super().__init__(parent)
+        self.sources = []
+        self.frame_rate = 0.0
+        self.frame_time = 0.0
+        self.queue_depth = 0
+        self._frames = 0
+        self._window_start = time.perf_counter()
+        # Attente des échantillons dans les SampleBuffer entre réception et affichage
+        self.queue_latency = METRICS.histogram("ui.queue_latency")
+        self.frame_times = METRICS.histogram("ui.frame_time")
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(int(1000 / frame_rate))
+        self.timer.timeout.connect(self.flush)
+
+    def add_source(self, buffer, handler):
+        self.sources.append((buffer, handler))
+
+    def start(self):
+        self._frames = 0
+        self._window_start = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def flush(self):
+        measure = METRICS.enabled
+        frame_start = time.perf_counter()
+        if measure:
+            now = time.time()
+        depth = 0
+        for buffer, handler in self.sources:
+            depth += buffer.depth()
+            samples = buffer.drain()
+            if samples:
+                if measure:
+                    for received_at, _ in samples:
+                        self.queue_latency.record(now - received_at)
+                handler(samples)
+        frame_end = time.perf_counter()
+
+        self.queue_depth = depth
+        self.frame_time = frame_end - frame_start
+        if measure:
+            self.frame_times.record(self.frame_time)
+        self._frames += 1
+        elapsed = frame_end - self._window_start
+        if elapsed >= 1.0:
+            self.frame_rate = self._frames / elapsed
+            self._frames = 0
+            self._window_start = frame_end
+            self.stats_updated.emit(self.frame_rate, self.queue_depth)
+
+
+# Nombre de points envoyés à un QLineSeries quand la largeur du graphique est inconnue
+DECIMATION_TARGET_POINTS = 1000
+
+
+class DecimatedSeries:
+    # Série multi-résolution pour les graphiques : les points récents sont gardés
+    # en pleine résolution, l'historique est réduit en paquets min/max. Quand il y
+    # a trop de paquets, ils sont fusionnés deux à deux (coût amorti O(1) par point).
+    def __init__(self, target_points=DECIMATION_TARGET_POINTS):
+        self.clear()
+        self.set_target_points(target_points)
+
+    def clear(self):
+        self.recent = deque()
+        self.buckets = []       # [min_x, min_y, max_x, max_y, count]
+        self.bucket_size = 1
+        self._current = None
+        self._history_points = []
+        self._first_x = None
+
+    def set_target_points(self, target_points):
+        # La moitié des points pour l'historique (2 points par paquet), l'autre pour le récent
+        self.target_points = max(target_points, 8)
+        self.recent_size = self.target_points // 2
+        self.max_buckets = self.target_points // 4
+        while len(self.recent) > self.recent_size:
+            self._add_to_history(self.recent.popleft())
+        while len(self.buckets) > self.max_buckets:
+            self._merge_buckets()
+
+    def append(self, x, y):
+        if self._first_x is None:
+            self._first_x = x
+        self.recent.append(QPointF(x, y))
+        if len(self.recent) > self.recent_size:
+            self._add_to_history(self.recent.popleft())
+
+    def _add_to_history(self, point):
+        x, y = point.x(), point.y()
+        bucket = self._current
+        if bucket is None:
+            bucket = self._current = [x, y, x, y, 0]
+        if y < bucket[1]:
+            bucket[0], bucket[1] = x, y
+        if y > bucket[3]:
+            bucket[2], bucket[3] = x, y
+        bucket[4] += 1
+        if bucket[4] >= self.bucket_size:
+            self._current = None
+            self.buckets.append(bucket)
+            self._history_points.extend(self._bucket_points(bucket))
+            if len(self.buckets) > self.max_buckets:
+                self._merge_buckets()
+
+    def _merge_buckets(self):
+        buckets = self.buckets
+        merged = []
+        for first, second in zip(buckets[0::2], buckets[1::2]):
+            low = first if first[1] <= second[1] else second
+            high = first if first[3] >= second[3] else second
+            merged.append([low[0], low[1], high[2], high[3], first[4] + second[4]])
+        if len(buckets) % 2 and self._current is None:
+            # Le paquet restant n'est pas plein à la nouvelle taille : il redevient le paquet en cours
+            self._current = buckets[-1]
+        elif len(buckets) % 2:
+            merged.append(buckets[-1])
+        self.buckets = merged
+        self.bucket_size *= 2
+        self._history_points = [point for bucket in merged for point in self._bucket_points(bucket)]
+
+    @staticmethod
+    def _bucket_points(bucket):
+        min_point = QPointF(bucket[0], bucket[1])
+        max_point = QPointF(bucket[2], bucket[3])
+        if bucket[0] == bucket[2]:
+            return [min_point]
+        return [min_point, max_point] if bucket[0] < bucket[2] else [max_point, min_point]
+
+    def points(self):
+        points = list(self._history_points)
+        if self._current is not None:
+            points.extend(self._bucket_points(self._current))
+        points.extend(self.recent)
+        return points
+
+    def first_x(self):
+        # x du premier point ajouté : celui des paquets min/max avance lors des fusions
+        return self._first_x
+
+    def last_x(self):
+        return self.recent[-1].x() if self.recent else None
+
+
+# Jointure des flux avant/après brique
+JOIN_TOLERANCE = 10.0    # secondes : écart maximal accepté entre deux échantillons appariés
+JOIN_HISTORY = 1024      # échantillons gardés en attente de leur contrepartie
+DERIVED_COLUMNS = ("timestamp", "delta_temperature", "humidity_gain", "efficiency")
+
+
+def sample_time(received_at, data):
+    # Heure de l'appareil si elle est fournie dans le message, sinon heure de réception
+    return data.get("ts", received_at)
+
+
+def wet_bulb_temperature(temperature, humidity):
+    # Formule de Stull (2011), valable pour 5 % < HR < 99 % et -20 °C < T < 50 °C
+    return (temperature * math.atan(0.151977 * math.sqrt(humidity + 8.313659))
+            + math.atan(temperature + humidity) - math.atan(humidity - 1.676331)
+            + 0.00391838 * humidity ** 1.5 * math.atan(0.023101 * humidity) - 4.686035)
+
+
+class StreamJoiner:
+    # Aligne le flux après brique (ESP1) sur le flux avant brique (ESP2) : chaque
+    # échantillon après brique est apparié à la valeur avant brique interpolée à
+    # son instant. Un échantillon plus récent que le dernier reçu avant brique
+    # attend le suivant. Coût amorti O(1) par échantillon.
+    INTERPOLATED = ("temperature", "pressure", "humidity")
+
+    def __init__(self, tolerance=JOIN_TOLERANCE):
+        self.tolerance = tolerance
+        self.clear()
+
+    def clear(self):
+        self.before = deque(maxlen=JOIN_HISTORY)
+        self.pending_after = deque(maxlen=JOIN_HISTORY)
+
+    def add_before(self, timestamp, data):
+        if self.before and timestamp < self.before[-1][0]:
+            return []   # échantillon arrivé dans le désordre
+        self.before.append((timestamp, data))
+        return self._join_pending()
+
+    def add_after(self, timestamp, data):
+        self.pending_after.append((timestamp, data))
+        return self._join_pending()
+
+    def _join_pending(self):
+        derived = []
+        while self.pending_after and self.before and self.pending_after[0][0] <= self.before[-1][0]:
+            timestamp, after = self.pending_after.popleft()
+            before = self._before_at(timestamp)
+            if before is not None:
+                derived.append((timestamp, self.derive(before, after)))
+        return derived
+
+    def _before_at(self, timestamp):
+        # Curseur avant : les échantillons après brique sont traités dans l'ordre, donc un
+        # échantillon avant brique dépassé par le suivant ne sert plus. Chacun n'est retiré
+        # qu'une fois, d'où un coût amorti O(1) même si un flux a pris de l'avance.
+        before = self.before
+        while len(before) > 1 and before[1][0] <= timestamp:
+            before.popleft()
+        previous_time, previous_data = before[0]
+        if len(before) == 1 or previous_time >= timestamp:
+            return previous_data if abs(previous_time - timestamp) <= self.tolerance else None
+        next_time, next_data = before[1]
+        if next_time - previous_time > 2 * self.tolerance:
+            # Trou dans le flux avant brique : valeur la plus proche si elle est assez proche
+            nearest_time, nearest = min((previous_time, previous_data), (next_time, next_data),
+                                        key=lambda sample: abs(sample[0] - timestamp))
+            return nearest if abs(nearest_time - timestamp) <= self.tolerance else None
+        fraction = (timestamp - previous_time) / (next_time - previous_time)
+        return {name: previous_data[name] + (next_data[name] - previous_data[name]) * fraction
+                for name in self.INTERPOLATED if name in previous_data and name in next_data}
+
+    @staticmethod
+    def derive(before, after):
+        temperature_before = before.get("temperature", math.nan)
+        humidity_before = before.get("humidity", math.nan)
+        delta_temperature = temperature_before - after.get("temperature", math.nan)
+        humidity_gain = after.get("humidity", math.nan) - humidity_before
+
+        # Efficacité évaporative : chute de température rapportée à la dépression psychrométrique
+        efficiency = math.nan
+        if 0 < humidity_before <= 100 and not math.isnan(temperature_before):
+            depression = temperature_before - wet_bulb_temperature(temperature_before, humidity_before)
+            if depression > 0.1:
+                efficiency = 100 * delta_temperature / depression
+        return {"delta_temperature": delta_temperature, "humidity_gain": humidity_gain, "efficiency": efficiency}
+
+
+# Nombre d'échantillons gardés en mémoire pour l'affichage de chaque tableau
+TABLE_RETENTION = 10000
+
+
+class SampleStore:
+    # Stockage en colonnes (array('d') préalloués) utilisé comme buffer circulaire.
+    # Les échantillons qui sortent du buffer sont écrits dans un fichier CSV
+    # temporaire pour conserver l'historique complet de la mesure.
+    COLUMNS = ("timestamp", "temperature", "pressure", "humidity")
+
+    def __init__(self, capacity=TABLE_RETENTION, columns=COLUMNS):
+        self.capacity = capacity
+        self.column_names = columns
+        self.columns = {name: array('d', bytes(8 * capacity)) for name in columns}
+        self.start = 0
+        self.size = 0
+        self.spilled = 0
+        self.spill_path = None
+        self._spill_file = None
+        self._spill_writer = None
+
+    def __len__(self):
+        return self.size
+
+    def value(self, row, column):
+        return self.columns[column][(self.start + row) % self.capacity]
+
+    def row(self, row):
+        index = (self.start + row) % self.capacity
+        return tuple(self.columns[name][index] for name in self.column_names)
+
+    def append(self, timestamp, data):
+        if self.size == self.capacity:
+            self.drop_oldest(1)
+        index = (self.start + self.size) % self.capacity
+        columns = self.columns
+        columns["timestamp"][index] = timestamp
+        for name in self.column_names[1:]:
+            columns[name][index] = data.get(name, math.nan)
+        self.size += 1
+
+    def extend(self, samples):
+        for timestamp, data in samples:
+            self.append(timestamp, data)
+
+    def spill_overflow(self, samples):
+        # Écrit directement sur disque la partie d'un lot qui ne tiendrait pas
+        # dans le buffer, et renvoie le reste
+        overflow = len(samples) - self.capacity
+        if overflow <= 0:
+            return samples
+        self.drop_oldest(self.size)
+        writer = self._spill()
+        for timestamp, data in samples[:overflow]:
+            writer.writerow([timestamp] + [data.get(name, math.nan) for name in self.column_names[1:]])
+        self.spilled += overflow
+        return samples[overflow:]
+
+    def drop_oldest(self, count):
+        writer = self._spill()
+        for row in range(count):
+            writer.writerow(self.row(row))
+        self.start = (self.start + count) % self.capacity
+        self.size -= count
+        self.spilled += count
+
+    def _spill(self):
+        if self._spill_writer is None:
+            fd, self.spill_path = tempfile.mkstemp(prefix="coolingbrick_", suffix=".csv")
+            self._spill_file = os.fdopen(fd, 'w', newline='')
+            self._spill_writer = csv.writer(self._spill_file)
+        return self._spill_writer
+
+    def snapshot(self):
+        # Copie figée pour un export en arrière-plan : les lignes déjà sur disque
+        # (lues plus tard par le worker) et une copie du contenu du buffer
+        if self._spill_file is not None:
+            self._spill_file.flush()
+        end = self.start + self.size
+        columns = {}
+        for name, column in self.columns.items():
+            if end <= self.capacity:
+                columns[name] = column[self.start:end]
+            else:
+                columns[name] = column[self.start:] + column[:end - self.capacity]
+        return {"spill_path": self.spill_path, "spilled": self.spilled, "columns": columns}
+
+    @staticmethod
+    def load_snapshot(snapshot):
+        # Historique complet d'un snapshot, sous forme de colonnes array('d')
+        names = list(snapshot["columns"])
+        columns = {name: array('d') for name in names}
+        if snapshot["spill_path"] is not None:
+            with open(snapshot["spill_path"], newline='') as file:
+                for record in itertools.islice(csv.reader(file), snapshot["spilled"]):
+                    for name, value in zip(names, record):
+                        columns[name].append(float(value))
+        for name in names:
+            columns[name].extend(snapshot["columns"][name])
+        return columns
+
+    def clear(self):
+        self.close()
+        self.start = 0
+        self.size = 0
+        self.spilled = 0
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            os.remove(self.spill_path)
+        self.spill_path = None
+        self._spill_file = None
+        self._spill_writer = None
+
+
+# Enregistrement des sessions de mesure
+SESSION_DIRECTORY = "sessions"
+SESSION_FSYNC_INTERVAL = 1.0     # secondes entre deux fsync
+SESSION_QUEUE_SIZE = 100000      # échantillons en attente d'écriture au maximum
+SESSION_BATCH_SIZE = 1000
+REPLAY_BATCH_SIZE = 5000         # messages relus entre deux mises à jour des tableaux
+
+
+class SessionRecorder:
+    active = None   # session en cours, partagée par tous les DataCollector
+    # Journal de session en ajout seul (une ligne JSON par message MQTT), écrit par
+    # un thread dédié. Chaque lot est vidé vers l'OS dès son écriture, puis synchronisé
+    # sur disque au plus fsync_interval secondes plus tard, même si le flux s'arrête.
+    # Un plantage du programme perd les messages encore dans la file (quelques ms de
+    # données en temps normal, jusqu'à max_queue si le disque ne suit pas) ; une coupure
+    # de courant perd en plus ce qui n'a pas encore été synchronisé. Une dernière ligne
+    # tronquée est retirée par repair().
+    def __init__(self, path, resume=False, fsync_interval=SESSION_FSYNC_INTERVAL,
+                 max_queue=SESSION_QUEUE_SIZE):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=1000)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume:
+            self.repair(path)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="SessionRecorder", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def new_session(cls, directory=SESSION_DIRECTORY):
+        name = datetime.now().strftime("session_%Y%m%d_%H%M%S.jsonl")
+        return cls(os.path.join(directory, name))
+
+    @classmethod
+    def start_session(cls, path=None):
+        # Remplace la session du processus ; la précédente est fermée une fois la
+        # nouvelle active, pour qu'aucun message ne tombe entre les deux
+        recorder = cls(path, resume=True) if path else cls.new_session()
+        previous, cls.active = cls.active, recorder
+        if previous is not None:
+            previous.close(discard_empty=True)
+        METRICS.add_source("recorder", recorder.stats)
+        return recorder
+
+    @classmethod
+    def shared(cls):
+        if cls.active is None:
+            cls.start_session()
+        return cls.active
+
+    @classmethod
+    def end_session(cls):
+        recorder, cls.active = cls.active, None
+        if recorder is not None:
+            recorder.close(discard_empty=True)
+            METRICS.remove_source("recorder")
+
+    def record(self, topic, received_at, data):
+        # Appelé depuis le thread MQTT : ne bloque jamais, la file est bornée
+        try:
+            self._queue.put_nowait((time.perf_counter(), received_at, topic, data))
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, discard_empty=False):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if discard_empty and os.path.exists(self.path) and os.path.getsize(self.path) == 0:
+            os.remove(self.path)
+
+    def _run(self):
+        last_sync = time.monotonic()
+        unsynced = False
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.fsync_interval)]
+            except queue.Empty:
+                # Flux à l'arrêt : on synchronise la dernière rafale sans attendre de message
+                if unsynced:
+                    os.fsync(self._file.fileno())
+                    last_sync = time.monotonic()
+                    unsynced = False
+                continue
+            while len(batch) < SESSION_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+
+            lines = [json.dumps({"t": received_at, "source": topic.split("/", 1)[0],
+                                 "topic": topic, "data": data})
+                     for _, received_at, topic, data in batch]
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                self.written += len(lines)
+                self.latencies.append(time.perf_counter() - batch[0][0])
+                unsynced = True
+
+            now = time.monotonic()
+            if not running or (unsynced and now - last_sync >= self.fsync_interval):
+                os.fsync(self._file.fileno())
+                last_sync = now
+                unsynced = False
+        self._file.close()
+
+    @staticmethod
+    def repair(path):
+        # Supprime une dernière ligne incomplète laissée par un plantage
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb+') as file:
+            content = file.read()
+            end = content.rfind(b"\n") + 1
+            if end != len(content):
+                file.truncate(end)
+
+    @staticmethod
+    def replay(path, end=None):
+        # Relit le journal ligne par ligne ; avec `end`, s'arrête à cette position pour
+        # ignorer ce qu'un SessionRecorder ajoute au fichier pendant la relecture
+        with open(path, 'rb') as file:
+            position = 0
+            for line in file:
+                position += len(line)
+                if end is not None and position > end:
+                    break
+                try:
+                    yield json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    # Ligne tronquée par un plantage
+                    continue
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queue_depth": self._queue.qsize(),
+            "write_latency_ms_mean": 1000 * sum(latencies) / len(latencies) if latencies else None,
+            "write_latency_ms_max": 1000 * latencies[-1] if latencies else None,
+        }
+
+
+class SampleTableModel(QAbstractTableModel):
+    # Modèle Qt au-dessus d'un SampleStore : la vue ne demande que les lignes visibles
+    HEADERS = ["Temperature (°C)", "Pressure (hPa)", "Humidity (%)"]
+    COLUMNS = ("temperature", "pressure", "humidity")
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return f"{self.store.value(index.row(), self.COLUMNS[index.column()]):.2f}"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        # Numéro de l'échantillon depuis le début de la mesure
+        return str(self.store.spilled + section + 1)
+
+    def append_samples(self, samples):
+        store = self.store
+        if not samples:
+            return
+        if len(samples) > store.capacity:
+            # Lot plus grand que le buffer : tout le contenu affiché est remplacé
+            self.beginResetModel()
+            store.extend(store.spill_overflow(samples))
+            self.endResetModel()
+            return
+        overflow = len(store) + len(samples) - store.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            store.drop_oldest(overflow)
+            self.endRemoveRows()
+        first = len(store)
+        self.beginInsertRows(QModelIndex(), first, first + len(samples) - 1)
+        store.extend(samples)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self.endResetModel()
+
+
+# Export
+EXPORT_IMAGE_SIZE = (1920, 1080)
+EXPORT_PERCENTILES = (5, 50, 95)
+PDF_DETAIL_ROW_LIMIT = 500     # au-delà, le tableau détaillé du PDF est résumé par intervalles
+PDF_SUMMARY_ROWS = 100
+
+EXPORT_STREAMS = {"before": "Avant la brique", "after": "Après la brique"}
+EXPORT_METRICS = {"temperature": "Température (°C)", "pressure": "Pression (hPa)", "humidity": "Humidité (%)"}
+EXPORT_DERIVED = {"delta_temperature": "Chute de température (°C)", "humidity_gain": "Gain d'humidité (%)",
+                  "efficiency": "Efficacité évaporative (%)"}
+
+
+def column_statistics(values):
+    # Toutes les statistiques d'une colonne à partir d'un seul tri
+    ordered = sorted(value for value in values if not math.isnan(value))
+    count = len(ordered)
+    if not count:
+        return None
+    mean = math.fsum(ordered) / count
+    stats = {
+        "count": count,
+        "mean": mean,
+        "std": math.sqrt(math.fsum((value - mean) ** 2 for value in ordered) / count),
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+    for percentile in EXPORT_PERCENTILES:
+        position = percentile / 100 * (count - 1)
+        lower = int(position)
+        upper = min(lower + 1, count - 1)
+        stats[f"p{percentile}"] = ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+    return stats
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportWorker(QThread):
+    # Construit le zip d'export (CSV, graphiques PNG, rapport PDF) hors du thread Qt.
+    # Tout est écrit directement dans l'archive, sans fichier temporaire.
+    progress = pyqtSignal(int, str)
+    export_finished = pyqtSignal(str)
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, file_path, snapshots, chart_images, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.snapshots = snapshots          # source -> SampleStore.snapshot(), "derived" pour le StreamJoiner
+        self.chart_images = chart_images    # métrique -> QImage
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise ExportCancelled()
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            self.export()
+        except ExportCancelled:
+            self.remove_partial_file()
+            self.export_failed.emit("Export annulé.")
+        except Exception as e:
+            self.remove_partial_file()
+            self.export_failed.emit(f"Erreur lors de l'export : {e}")
+        else:
+            if METRICS.enabled:
+                METRICS.histogram("export.duration").record(time.perf_counter() - started)
+            self.export_finished.emit(self.file_path)
+
+    def remove_partial_file(self):
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def export(self):
+        self.progress.emit(0, "Lecture des données...")
+        streams = {source: SampleStore.load_snapshot(snapshot) for source, snapshot in self.snapshots.items()}
+        derived = streams.pop("derived", None)
+        self.check_cancelled()
+
+        with zipfile.ZipFile(self.file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            self.progress.emit(10, "Écriture des données CSV...")
+            with zipf.open("data.csv", 'w') as binary_file:
+                self.write_csv(io.TextIOWrapper(binary_file, encoding='utf-8', newline=''), streams)
+            if derived is not None:
+                with zipf.open("derived.csv", 'w') as binary_file:
+                    self.write_csv(io.TextIOWrapper(binary_file, encoding='utf-8', newline=''),
+                                   {"derived": derived}, DERIVED_COLUMNS)
+
+            self.progress.emit(40, "Calcul des statistiques...")
+            stats = {source: {metric: column_statistics(columns[metric]) for metric in EXPORT_METRICS}
+                     for source, columns in streams.items()}
+            if derived is not None:
+                stats["derived"] = {metric: column_statistics(derived[metric]) for metric in EXPORT_DERIVED}
+            self.check_cancelled()
+
+            self.progress.emit(50, "Export des graphiques...")
+            images = {}
+            for metric, image in self.chart_images.items():
+                images[metric] = self.encode_png(image)
+                zipf.writestr(f"{metric}_graph.png", images[metric])
+                self.check_cancelled()
+
+            self.progress.emit(70, "Génération du rapport PDF...")
+            pdf_buffer = io.BytesIO()
+            self.generate_pdf_report(pdf_buffer, streams, stats, images)
+            zipf.writestr("rapport_mesures.pdf", pdf_buffer.getvalue())
+        self.progress.emit(100, "Export terminé.")
+
+    def write_csv(self, file, streams, column_names=SampleStore.COLUMNS):
+        writer = csv.writer(file)
+        writer.writerow(["source"] + list(column_names))
+        total = max(sum(len(columns["timestamp"]) for columns in streams.values()), 1)
+        written = 0
+        for source, columns in streams.items():
+            for start in range(0, len(columns["timestamp"]), 10000):
+                self.check_cancelled()
+                chunk = [columns[name][start:start + 10000] for name in column_names]
+                writer.writerows([source, *row] for row in zip(*chunk))
+                written += len(chunk[0])
+                self.progress.emit(10 + 30 * written // total, "Écriture des données CSV...")
+        file.flush()
+        file.detach()
+
+    @staticmethod
+    def encode_png(image):
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, 'PNG')
+        return bytes(buffer.data())
+
+    def detail_table(self, columns):
+        # Tableau détaillé, ou résumé par intervalles de temps au-delà de PDF_DETAIL_ROW_LIMIT lignes
+        timestamps = columns["timestamp"]
+        count = len(timestamps)
+        origin = timestamps[0]
+        if count <= PDF_DETAIL_ROW_LIMIT:
+            rows = [['N°', 'Temps (s)'] + list(EXPORT_METRICS.values())]
+            for index in range(count):
+                rows.append([str(index + 1), f"{timestamps[index] - origin:.1f}"]
+                            + [f"{columns[metric][index]:.2f}" for metric in EXPORT_METRICS])
+            return rows, False
+
+        rows = [['Échantillons', 'Temps (s)'] + [f"{label} moy." for label in EXPORT_METRICS.values()]]
+        step = math.ceil(count / PDF_SUMMARY_ROWS)
+        for start in range(0, count, step):
+            end = min(start + step, count)
+            row = [f"{start + 1}-{end}", f"{timestamps[start] - origin:.0f}-{timestamps[end - 1] - origin:.0f}"]
+            for metric in EXPORT_METRICS:
+                values = [value for value in columns[metric][start:end] if not math.isnan(value)]
+                row.append(f"{math.fsum(values) / len(values):.2f}" if values else "-")
+            rows.append(row)
+        return rows, True
+
+    def generate_pdf_report(self, output, streams, stats, images):
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+        # Créer un PDF avec des statistiques détaillées
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=letter,
+            rightMargin=50,
+            leftMargin=50,
+            topMargin=50,
+            bottomMargin=50
+        )
+        
+        # Créer des styles personnalisés
+        styles = getSampleStyleSheet()
+        
+        # Style du titre principal
+        styles.add(ParagraphStyle(
+            name='CustomTitle',
+            parent=styles['Title'],
+            fontSize=24,
+            spaceAfter=30,
+            textColor=colors.HexColor('#2D3748'),
+            fontName='Helvetica-Bold'
+        ))
+        
+        # Style des sous-titres
+        styles.add(ParagraphStyle(
+            name='CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=18,
+            spaceBefore=20,
+            spaceAfter=20,
+            textColor=colors.HexColor('#2D3748'),
+            fontName='Helvetica-Bold'
+        ))
+        
+        # Style du texte normal
+        styles.add(ParagraphStyle(
+            name='CustomNormal',
+            parent=styles['Normal'],
+            fontSize=12,
+            textColor=colors.HexColor('#4A5568'),
+            fontName='Helvetica',
+            spaceBefore=6,
+            spaceAfter=6
+        ))
+        
+        # Elements du rapport
+        elements = []
+        
+        # En-tête avec logo
+        header = Table([[
+            Paragraph("Rapport de Mesures du Banc de Test", styles['CustomTitle'])
+        ]], colWidths=[None])
+        header.setStyle(TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]))
+        elements.append(header)
+        elements.append(Spacer(1, 20))
+        
+        # Informations de base
+        now = datetime.now()
+        timestamps = [columns["timestamp"] for columns in streams.values() if columns["timestamp"]]
+        duration = max(map(max, timestamps)) - min(map(min, timestamps)) if timestamps else 0
+        sample_count = sum(len(columns["timestamp"]) for columns in streams.values())
+        
+        # Carte d'informations
+        info_data = [
+            [Paragraph("Date et heure :", styles['CustomNormal']),
+            Paragraph(now.strftime('%d/%m/%Y %H:%M:%S'), styles['CustomNormal'])],
+            [Paragraph("Durée de la mesure :", styles['CustomNormal']),
+            Paragraph(f"{duration:.0f} secondes", styles['CustomNormal'])],
+            [Paragraph("Échantillons :", styles['CustomNormal']),
+            Paragraph(str(sample_count), styles['CustomNormal'])]
+        ]
+        
+        info_table = Table(info_data, colWidths=[150, None])
+        info_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F7FAFC')),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#E2E8F0')),
+            ('PADDING', (0, 0), (-1, -1), 12),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ROUNDEDCORNERS', [10, 10, 10, 10]),
+        ]))
+        elements.append(info_table)
+        elements.append(Spacer(1, 30))
+
+        table_style = [
+            # En-tête
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#C17817')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            # Corps du tableau
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.HexColor('#4A5568')),
+            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#E2E8F0')),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('PADDING', (0, 0), (-1, -1), 6),
+            # Style alterné pour les lignes, en une seule commande
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F7FAFC')]),
+        ]
+
+        if sample_count:
+            elements.append(Paragraph("Résumé des Statistiques", styles['CustomHeading']))
+
+            # Tableau des statistiques
+            percentile_labels = [f"P{percentile}" for percentile in EXPORT_PERCENTILES]
+            stats_data = [['Métrique', 'Moyenne', 'Écart-type', 'Min'] + percentile_labels + ['Max']]
+            for source, label in EXPORT_STREAMS.items():
+                for metric, metric_label in EXPORT_METRICS.items():
+                    metric_stats = stats.get(source, {}).get(metric)
+                    if metric_stats is None:
+                        continue
+                    keys = ['mean', 'std', 'min'] + [f"p{percentile}" for percentile in EXPORT_PERCENTILES] + ['max']
+                    stats_data.append([f"{metric_label}\n{label}"] + [f"{metric_stats[key]:.2f}" for key in keys])
+
+            stats_table = Table(stats_data, repeatRows=1)
+            stats_table.setStyle(TableStyle(table_style))
+            elements.append(stats_table)
+            elements.append(Spacer(1, 20))
+
+            # Écart entre l'air après et avant la brique
+            delta_data = [['Métrique', 'Moyenne avant', 'Moyenne après', 'Écart (après - avant)']]
+            for metric, metric_label in EXPORT_METRICS.items():
+                before = stats.get("before", {}).get(metric)
+                after = stats.get("after", {}).get(metric)
+                if before is not None and after is not None:
+                    delta_data.append([metric_label, f"{before['mean']:.2f}", f"{after['mean']:.2f}",
+                                       f"{after['mean'] - before['mean']:+.2f}"])
+            if len(delta_data) > 1:
+                delta_table = Table(delta_data)
+                delta_table.setStyle(TableStyle(table_style))
+                elements.append(delta_table)
+            elements.append(Spacer(1, 30))
+
+            # Grandeurs dérivées des deux flux alignés dans le temps
+            derived_data = [['Grandeur', 'Moyenne', 'Écart-type', 'Min'] + percentile_labels + ['Max']]
+            for metric, metric_label in EXPORT_DERIVED.items():
+                metric_stats = stats.get("derived", {}).get(metric)
+                if metric_stats is None:
+                    continue
+                keys = ['mean', 'std', 'min'] + [f"p{percentile}" for percentile in EXPORT_PERCENTILES] + ['max']
+                derived_data.append([metric_label] + [f"{metric_stats[key]:.2f}" for key in keys])
+            if len(derived_data) > 1:
+                elements.append(Paragraph("Performance de la brique", styles['CustomHeading']))
+                elements.append(Paragraph(
+                    f"{max(metric_stats['count'] for metric_stats in stats['derived'].values() if metric_stats)} "
+                    "paires d'échantillons avant/après "
+                    "alignées dans le temps. Le détail se trouve dans derived.csv.",
+                    styles['CustomNormal']
+                ))
+                derived_table = Table(derived_data, repeatRows=1)
+                derived_table.setStyle(TableStyle(table_style))
+                elements.append(derived_table)
+                elements.append(Spacer(1, 30))
+            self.check_cancelled()
+
+            # Tableau détaillé
+            for source, label in EXPORT_STREAMS.items():
+                columns = streams.get(source)
+                if columns is None or not columns["timestamp"]:
+                    continue
+                rows, summarised = self.detail_table(columns)
+                elements.append(Paragraph(f"Données Détaillées - {label}", styles['CustomHeading']))
+                if summarised:
+                    elements.append(Paragraph(
+                        f"{len(columns['timestamp'])} échantillons, résumés par intervalles. "
+                        "L'ensemble des mesures se trouve dans data.csv.",
+                        styles['CustomNormal']
+                    ))
+                data_table = Table(rows, repeatRows=1)
+                data_table.setStyle(TableStyle(table_style))
+                elements.append(data_table)
+                elements.append(Spacer(1, 30))
+                self.check_cancelled()
+
+            # Graphiques
+            elements.append(Paragraph("Visualisation des Données", styles['CustomHeading']))
+            
+            for metric, png in images.items():
+                img = Image(io.BytesIO(png), width=450, height=280)
+                img.hAlign = 'CENTER'
+                label = EXPORT_METRICS.get(metric) or EXPORT_DERIVED.get(metric, metric)
+                elements.append(Paragraph(f"Graphique - {label}", styles['CustomNormal']))
+                elements.append(img)
+                elements.append(Spacer(1, 20))
+
+        else:
+            elements.append(Paragraph(
+                "Aucune donnée n'a été collectée.",
+                styles['CustomNormal']
+            ))
+
+        # Pied de page
+        elements.append(Spacer(1, 30))
+        footer = Paragraph(
+            "© 2025 - INSA Toulouse",
+            ParagraphStyle(
+                'Footer',
+                parent=styles['Normal'],
+                fontSize=8,
+                textColor=colors.HexColor('#A0AEC0'),
+                alignment=1
+            )
+        )
+        elements.append(footer)
+
+        # Construire le PDF
+        self.check_cancelled()
+        doc.build(elements)
+
+
+# Styles communs à toutes les fenêtres. Posés une seule fois sur la QApplication,
+# ils ne sont analysés qu'une fois ; chaque fenêtre n'ajoute que ses propres règles.
+SHARED_STYLESHEET = """
+        QWidget {
+            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
+        }
+        
+        QWidget[class="card"] {
+            background-color: white;
+            border-radius: 15px;
+            min-width: 300px;
+            padding: 30px;
+        }
+        
+        QPushButton {
+            background-color: #C17817;
+            color: white;
+            border: none;
+            padding: 12px 20px;
+            text-align: center;
+            font-size: 16px;
+            border-radius: 10px;
+            font-weight: bold;
+        }
+        
+        QPushButton:hover {
+            background-color: #D7891B;
+        }
+        
+        QPushButton:pressed {
+            background-color: #9C5F13;
+        }
+        
+        QMainWindow {
+            background-color: #fcfaf7;
+        }
+        
+        QLabel {
+            font-size: 14px;
+        }
+        """
+
+
+def apply_shared_stylesheet():
+    app = QApplication.instance()
+    if app.styleSheet() != SHARED_STYLESHEET:
+        app.setStyleSheet(SHARED_STYLESHEET)
+
+
+# Fenêtres de navigation : créées à la première ouverture, puis simplement réaffichées
+_windows = {}
+
+
+def show_window(window_class, *args):
+    window = _windows.get(window_class)
+    if window is None:
+        window = window_class(*args)
+        _windows[window_class] = window
+    window.show()
+    window.raise_()
+    window.activateWindow()
+    return window
+
+
+def forget_window(window):
+    # Une fenêtre qui libère ses ressources à la fermeture sera recréée à la prochaine ouverture
+    if _windows.get(type(window)) is window:
+        del _windows[type(window)]
+
+
+class HomeWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Main Menu")
+        self.setGeometry(100, 100, 1000, 800)
+        apply_shared_stylesheet()
+        self.setStyleSheet(self.get_stylesheet())
+
+        # Main layout with margins for better spacing
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(30)
+
+        # Header section
+        header_widget = QWidget()
+        header_layout = QHBoxLayout()
+        
+        # Logo/Icon (you can replace with your own)
+        logo_label = QLabel("🧱")
+        logo_label.setStyleSheet("font-size: 32px;")
+        header_layout.addWidget(logo_label)
+
+        # Title section with subtitle
+        title_widget = QWidget()
+        title_layout = QVBoxLayout()
+        
+        title_label = QLabel("Test Bench")
+        title_label.setStyleSheet("font-size: 32px; font-weight: bold; color: #2D3748;")
+        
+        subtitle_label = QLabel("Earth Brick Characterisation.")
+        subtitle_label.setStyleSheet("font-size: 16px; color: #718096;")
+        
+        title_layout.addWidget(title_label)
+        title_layout.addWidget(subtitle_label)
+        title_layout.setSpacing(5)
+        
+        title_widget.setLayout(title_layout)
+        header_layout.addWidget(title_widget)
+        header_layout.addStretch()
+        
+        header_widget.setLayout(header_layout)
+        layout.addWidget(header_widget)
+
+        # Cards container
+        cards_widget = QWidget()
+        cards_layout = QHBoxLayout()
+        cards_layout.setSpacing(20)
+
+        # Protocol Card
+        protocol_card = QWidget()
+        protocol_layout = QVBoxLayout()
+        protocol_card.setProperty("class", "card")
+        
+        protocol_icon = QLabel("📋")
+        protocol_icon.setAlignment(Qt.AlignCenter)
+        protocol_icon.setStyleSheet("font-size: 48px; margin-bottom: 20px;")
+        
+        protocol_title = QLabel("Protocols")
+        protocol_title.setAlignment(Qt.AlignCenter)
+        protocol_title.setStyleSheet("font-size: 20px; font-weight: bold; color: #2D3748; margin-bottom: 10px;")
+        
+        protocol_desc = QLabel()
+        protocol_desc.setAlignment(Qt.AlignCenter)
+        protocol_desc.setWordWrap(True)
+        protocol_desc.setText(
+            "<p style='line-height: 1.6; margin: 0;'>See the steps required to perform the<br>experiment and characterization.</p>"
+        )
+        protocol_desc.setStyleSheet("font-size: 15px; color: #718096; margin-bottom: 20px;")
+        
+        protocol_button = QPushButton("See steps")
+        protocol_button.setFixedSize(200, 50)
+        protocol_button.clicked.connect(self.open_protocol_window)
+        
+        protocol_layout.addWidget(protocol_icon)
+        protocol_layout.addWidget(protocol_title)
+        protocol_layout.addWidget(protocol_desc)
+        protocol_layout.addWidget(protocol_button, alignment=Qt.AlignCenter)
+        protocol_card.setLayout(protocol_layout)
+
+        # Acquisition Card
+        acquisition_card = QWidget()
+        acquisition_layout = QVBoxLayout()
+        acquisition_card.setProperty("class", "card")
+        
+        acquisition_icon = QLabel("📊")
+        acquisition_icon.setAlignment(Qt.AlignCenter)
+        acquisition_icon.setStyleSheet("font-size: 48px; margin-bottom: 20px;")
+        
+        acquisition_title = QLabel("Acquisition")
+        acquisition_title.setAlignment(Qt.AlignCenter)
+        acquisition_title.setStyleSheet("font-size: 20px; font-weight: bold; color: #2D3748; margin-bottom: 10px;")
+        
+        acquisition_desc = QLabel("Start a new data acquisition.")
+        acquisition_desc.setAlignment(Qt.AlignCenter)
+        acquisition_desc.setWordWrap(True)
+        acquisition_desc.setStyleSheet("font-size: 15px; color: #718096; margin-bottom: 20px;")
+        
+        acquisition_button = QPushButton("Start")
+        acquisition_button.setFixedSize(200, 50)
+        acquisition_button.clicked.connect(self.open_acquisition_window)
+        
+        acquisition_layout.addWidget(acquisition_icon)
+        acquisition_layout.addWidget(acquisition_title)
+        acquisition_layout.addWidget(acquisition_desc)
+        acquisition_layout.addWidget(acquisition_button, alignment=Qt.AlignCenter)
+        acquisition_card.setLayout(acquisition_layout)
+
+        # Add cards to container
+        cards_layout.addWidget(protocol_card)
+        cards_layout.addWidget(acquisition_card)
+        cards_widget.setLayout(cards_layout)
+        
+        layout.addWidget(cards_widget)
+        layout.addStretch()
+
+        # Footer
+        footer_label = QLabel("© 2025 - INSA Toulouse")
+        footer_label.setAlignment(Qt.AlignCenter)
+        footer_label.setStyleSheet("color: #A0AEC0; font-size: 12px;")
+        layout.addWidget(footer_label)
+
+        central_widget = QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+
+    def open_protocol_window(self):
+        show_window(ProtocolWindow)
+        self.close()
+
+    def open_acquisition_window(self):
+        show_window(ParametreAcquisitionWindow)
+        self.close()
+
+    def get_stylesheet(self):
+        return """
+        QWidget[class="card"] {
+            max-width: 400px;
+            min-height: 400px;
+        }
+
+        QTableWidget {
+            border: 1px solid #E2E8F0;
+            border-radius: 10px;
+            background-color: white;
+            gridline-color: #EDF2F7;
+        }
+        
+        QHeaderView::section {
+            background-color: #4A5568;
+            color: white;
+            padding: 8px;
+            font-size: 14px;
+            border: none;
+            font-weight: bold;
+        }
+        
+        QTableWidget::item {
+            padding: 8px;
+        }
+        """
+
+class ProtocolWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Protocols")
+        self.setGeometry(100, 100, 1000, 800)
+        apply_shared_stylesheet()
+        self.setStyleSheet(self.get_stylesheet())
+
+        # Main layout with margins for better spacing
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(30)
+
+        # Header section
+        header_widget = QWidget()
+        header_layout = QHBoxLayout()
+        
+        # Logo/Icon
+        logo_label = QLabel("📋")
+        logo_label.setStyleSheet("font-size: 32px;")
+        header_layout.addWidget(logo_label)
+
+        # Title section with subtitle
+        title_widget = QWidget()
+        title_layout = QVBoxLayout()
+        
+        title_label = QLabel("Protocols")
+        title_label.setStyleSheet("font-size: 32px; font-weight: bold; color: #2D3748;")
+        
+        subtitle_label = QLabel("Installation and characterisation guide.")
+        subtitle_label.setStyleSheet("font-size: 16px; color: #718096;")
+        
+        title_layout.addWidget(title_label)
+        title_layout.addWidget(subtitle_label)
+        title_layout.setSpacing(5)
+        
+        title_widget.setLayout(title_layout)
+        header_layout.addWidget(title_widget)
+        header_layout.addStretch()
+        
+        header_widget.setLayout(header_layout)
+        layout.addWidget(header_widget)
+
+        # Cards container
+        cards_widget = QWidget()
+        cards_layout = QHBoxLayout()
+        cards_layout.setSpacing(30)
+
+        # Installation Protocol Card
+        install_card = QWidget()
+        install_card.setProperty("class", "card")
+
+        install_layout = QVBoxLayout()
+        install_layout.setContentsMargins(10, 20, 10, 10)
+        install_layout.setSpacing(20)
+
+        # Title
+        install_title = QLabel("Installation protocol")
+        install_title.setStyleSheet("font-size: 20px; "
+                                    "font-weight: bold; "
+                                    "color: #2D3748; "
+                                    "margin-left: 25px")
+        install_layout.addWidget(install_title)
+
+        # Steps for Installation Protocol
+        steps = [
+            "1. Make sure the test bench is properly installed.",
+            "2. Make sure that the ESP acquisition cards are powered.",
+            "3. Make sure that the sensors are properly connected to the ESP acquisition cards.",
+            "4. Start the configuration of the data acquisition."
+        ]
+
+        for step in steps:
+            step_label = QLabel(step)
+            step_label.setWordWrap(True)
+            step_label.setText(f"<p style='line-height: 1.6; margin: 0;'>{step}</p>")
+            step_label.setStyleSheet("color: #718096; font-size: 14px; margin-bottom: 5px; margin-left: 10px; margin-right: 10px;")
+            install_layout.addWidget(step_label)  # Correctly adding to install_layout
+
+        install_card.setLayout(install_layout)
+
+        # Characterisation Protocol Card
+        charac_card = QWidget()
+        charac_card.setProperty("class", "card")
+
+        charac_layout = QVBoxLayout()
+        charac_layout.setContentsMargins(10, 20, 10, 10)
+        charac_layout.setSpacing(20)
+
+        # Title for Characterisation Protocol
+        charac_title = QLabel("Characterisation protocol")
+        charac_title.setStyleSheet("font-size: 20px; "
+                                    "font-weight: bold; "
+                                    "color: #2D3748; "
+                                    "margin-left: 25px")
+        charac_layout.addWidget(charac_title)
+
+        # Protocol Steps for Characterisation
+        protocol = [
+            "1. Set brick humidity level from 0% (completely dry) to 100% (fully water saturated) based on the characterisation requirements.",
+            "2. Position the brick in the center of the test chamber.",
+            "3. Ensure complete chamber sealing by firmly closing all latches.",
+            "4. Configure acquisition parameters and initiate the data collection sequence"
+        ]
+
+        for step in protocol:
+            protocol_label = QLabel(step)
+            protocol_label.setWordWrap(True)
+            protocol_label.setText(f"<p style='line-height: 1.6; margin: 0;'>{step}</p>")
+            protocol_label.setStyleSheet("color: #718096; font-size: 14px; margin-bottom: 3px; margin-left: 10px; margin-right: 10px;")
+            charac_layout.addWidget(protocol_label)  # Add to charac_layout instead of install_layout
+
+        charac_card.setLayout(charac_layout)
+
+        # Add cards to container
+        cards_layout.addWidget(install_card)
+        cards_layout.addWidget(charac_card)
+        cards_widget.setLayout(cards_layout)
+
+        layout.addWidget(cards_widget)
+        layout.addStretch()
+
+
+        # Back Button
+        back_button = QPushButton("Back to Menu")
+        back_button.setFixedSize(200, 50)
+        back_button.clicked.connect(self.open_home_window)
+        layout.addWidget(back_button, alignment=Qt.AlignCenter)
+
+        # Footer
+        footer_label = QLabel("© 2025 - INSA Toulouse")
+        footer_label.setAlignment(Qt.AlignCenter)
+        footer_label.setStyleSheet("color: #A0AEC0; font-size: 12px;")
+        layout.addWidget(footer_label)
+
+        central_widget = QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+
+    def open_home_window(self):
+        show_window(HomeWindow)
+        self.close()
+
+    def get_stylesheet(self):
+        return """
+        QWidget[class="card"] {
+            max-width: 400px;
+            min-height: 300px;
+        }
+
+        QTableWidget {
+            border: 1px solid #E2E8F0;
+            border-radius: 10px;
+            background-color: white;
+            gridline-color: #EDF2F7;
+        }
+        
+        QHeaderView::section {
+            background-color: #4A5568;
+            color: white;
+            padding: 8px;
+            font-size: 14px;
+            border: none;
+            font-weight: bold;
+        }
+        
+        QTableWidget::item {
+            padding: 8px;
+        }
+        """
+
+class ParametreAcquisitionWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Acquisition parameters")
+        self.setGeometry(100, 100, 1000, 800)
+        apply_shared_stylesheet()
+        self.setStyleSheet(self.get_stylesheet())
+
+        # Main layout with margins for better spacing
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(10)
+
+        # Header section
+        header_widget = QWidget()
+        header_layout = QHBoxLayout()
+        
+        # Logo/Icon
+        logo_label = QLabel("🎛️")
+        logo_label.setStyleSheet("font-size: 32px;")
+        header_layout.addWidget(logo_label)
+
+        # Title section with subtitle
+        title_widget = QWidget()
+        title_layout = QVBoxLayout()
+        
+        title_label = QLabel("Acquisition parameters")
+        title_label.setStyleSheet("font-size: 32px; font-weight: bold; color: #2D3748;")
+        
+        subtitle_label = QLabel("Configuration of settings for data acquisition.")
+        subtitle_label.setStyleSheet("font-size: 16px; color: #718096;")
+        
+        title_layout.addWidget(title_label)
+        title_layout.addWidget(subtitle_label)
+        title_layout.setSpacing(5)
+        
+        title_widget.setLayout(title_layout)
+        header_layout.addWidget(title_widget)
+        header_layout.addStretch()
+        
+        header_widget.setLayout(header_layout)
+        layout.addWidget(header_widget)
+
+        # Protocol Card
+        protocol_card = QWidget()
+        protocol_card.setProperty("class", "card")
+        protocol_layout = QVBoxLayout()
+        protocol_layout.setSpacing(10)
+        protocol_layout.setContentsMargins(10, 20, 10, 25)  # ltrb
+        
+        protocol_title = QLabel("Start and verification protocols")
+        protocol_title.setStyleSheet("font-size: 20px; font-weight: bold; color: #2D3748; margin-bottom: 20px; margin-left: 25px;")
+        protocol_layout.addWidget(protocol_title)
+
+        steps = [
+            "1. Make sure the slider values the one wanted for the characterisation.",
+            "2. Check that the ESP acquisition cards are powered.",
+            "3. Launch the acquisition interface when ready."
+        ]
+
+        
+        for step in steps:
+            step_label = QLabel(step)
+            step_label.setWordWrap(True)
+            step_label.setStyleSheet("color: #718096; font-size: 14px; margin-bottom: 10px; margin-left: 5px;")
+            protocol_layout.addWidget(step_label)
+
+        protocol_card.setLayout(protocol_layout)
+        layout.addWidget(protocol_card)
+
+        # Parameters Card
+        params_card = QWidget()
+        params_card.setProperty("class", "card")
+        params_layout = QVBoxLayout()
+        params_layout.setSpacing(10)
+        params_layout.setContentsMargins(10, 20, 10, 25)  # ltrb
+        
+        params_title = QLabel("Parameters")
+        params_title.setStyleSheet("font-size: 20px; font-weight: bold; color: #2D3748; margin-bottom: 20px; margin-left: 25px;")
+        params_layout.addWidget(params_title)
+
+        # Temperature Slider
+        self.temp_label = QLabel("Temperature (°C): 25°C")
+        self.temp_label.setStyleSheet("color: #718096; font-size: 14px; margin-bottom: 5px;")
+        self.temp_slider = QSlider(Qt.Horizontal)
+        self.temp_slider.setMinimum(20)
+        self.temp_slider.setMaximum(50)
+        self.temp_slider.setValue(25)
+        self.temp_slider.setTickPosition(QSlider.TicksBelow)
+        self.temp_slider.setTickInterval(5)
+        self.temp_slider.setSingleStep(5)
+        self.temp_slider.setPageStep(5)
+        self.temp_slider.valueChanged.connect(self.on_slider_value_changed_temp)
+        params_layout.addWidget(self.temp_label)
+        params_layout.addWidget(self.temp_slider)
+
+        # Wind Speed Slider
+        self.wind_label = QLabel("Wind speed (km/h): 10 km/h")
+        self.wind_label.setStyleSheet("color: #718096; font-size: 14px; margin-bottom: 5px; margin-top: 20px;")
+        self.wind_slider = QSlider(Qt.Horizontal)
+        self.wind_slider.setMinimum(0)
+        self.wind_slider.setMaximum(35)
+        self.wind_slider.setValue(10)
+        self.wind_slider.setTickPosition(QSlider.TicksBelow)
+        self.wind_slider.setTickInterval(10)
+        self.wind_slider.setSingleStep(5)
+        self.wind_slider.setPageStep(5)
+        self.wind_slider.valueChanged.connect(self.on_slider_value_changed_wind)
+        params_layout.addWidget(self.wind_label)
+        params_layout.addWidget(self.wind_slider)
+
+        # Humidity Slider
+        self.humidity_label = QLabel("Humidity (%): 50%")
+        self.humidity_label.setStyleSheet("color: #718096; font-size: 14px; margin-bottom: 5px; margin-top: 20px;")
+        self.humidity_slider = QSlider(Qt.Horizontal)
+        self.humidity_slider.setMinimum(0)
+        self.humidity_slider.setMaximum(100)
+        self.humidity_slider.setValue(50)
+        self.humidity_slider.setTickPosition(QSlider.TicksBelow)
+        self.humidity_slider.setTickInterval(10)
+        self.humidity_slider.setSingleStep(5)
+        self.humidity_slider.setPageStep(5)
+        self.humidity_slider.valueChanged.connect(self.on_slider_value_changed_humidity)
+        params_layout.addWidget(self.humidity_label)
+        params_layout.addWidget(self.humidity_slider)
+
+        spacer_widget = QWidget()
+        spacer_widget.setFixedHeight(10)
+        params_layout.addWidget(spacer_widget)
+
+        params_card.setLayout(params_layout)
+        layout.addWidget(params_card)
+
+        # Navigation Buttons
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+
+        back_button = QPushButton("Back to Menu")
+        back_button.setFixedSize(200, 50)
+        back_button.clicked.connect(self.open_home_window)
+        button_layout.addWidget(back_button)
+
+        start_button = QPushButton("Start Acquisition")
+        start_button.setFixedSize(200, 50)
+        start_button.clicked.connect(self.initialize_acquisition)
+        button_layout.addWidget(start_button)
+
+        layout.addLayout(button_layout)
+
+        layout.addStretch()
+
+        # Footer
+        footer_label = QLabel("© 2025 - INSA Toulouse")
+        footer_label.setAlignment(Qt.AlignCenter)
+        footer_label.setStyleSheet("color: #A0AEC0; font-size: 12px;")
+        layout.addWidget(footer_label)
+
+        central_widget = QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+
+    def on_slider_value_changed_temp(self, value):
+        rounded_value = round(value / 5) * 5
+        self.temp_slider.setValue(rounded_value)
+        self.temp_label.setText(f"Temperature (°C): {rounded_value}°C")
+
+    def on_slider_value_changed_wind(self, value):
+        rounded_value = round(value / 5) * 5
+        self.wind_slider.setValue(rounded_value)
+        self.wind_label.setText(f"Wind speed (km/h): {rounded_value} km/h")
+
+    def on_slider_value_changed_humidity(self, value):
+        rounded_value = round(value / 5) * 5
+        self.humidity_slider.setValue(rounded_value)
+        self.humidity_label.setText(f"Humidity (%): {rounded_value}%")
+        
+    def open_home_window(self):
+        show_window(HomeWindow)
+        self.close()
+
+    def initialize_acquisition(self):
+        self.send_command()
+        self.open_acquisition_window()
+
+    def send_command(self):
+        # Get the slider values
+        temperature = self.temp_slider.value()
+        wind_speed = self.wind_slider.value()
+        
+        # Prepare the JSON payload
+        command_payload = {
+            "temperature": temperature,
+            "wind_speed": wind_speed
+        }
+        
+        # Convert the payload to a JSON string
+        command_json = json.dumps(command_payload)
+        
+        # Publish the JSON to the MQTT topic
+        MqttService.instance().publish(ESP2_TOPIC_COMMAND, command_json, COMMAND_QOS)
+
+        print(f"Sent command: {command_json}")
+
+    def open_acquisition_window(self):
+        temperature = self.get_temperature()
+        self.acquisition_window = AcquisitionWindow(temperature)
+        self.acquisition_window.show()
+        self.close()
+
+    def get_temperature(self):
+        return self.temp_slider.value()
+    
+
+    def get_stylesheet(self):
+        return """
+        QWidget[class="card"] {
+            margin-bottom: 20px;
+        }
+
+        QSlider::groove:horizontal {
+            border: none;
+            height: 6px;  /* Plus épais pour permettre plus d'arrondi */
+            background: #E2E8F0;
+            border-radius: 3px;  /* Arrondi plus prononcé */
+        }
+
+        QSlider::sub-page:horizontal {
+            background: #C17817;
+            border-radius: 3px;  /* Arrondi identique à la groove */
+        }
+
+        QSlider::add-page:horizontal {
+            background: #E2E8F0;
+            border-radius: 3px;  /* Arrondi identique à la groove */
+        }
+
+        QSlider::handle:horizontal {
+            background: #C17817;
+            width: 16px;
+            height: 16px;
+            margin: -5px 0;
+            border-radius: 8px;  /* La moitié de width/height pour garantir un cercle parfait */
+        }
+
+        QSlider::handle:horizontal:hover {
+            background: #D89234;
+        }
+
+        QSlider::handle:horizontal:pressed {
+            background: #9C5F13;
+            border-radius: 8px;  /* Maintient l'arrondi même en état pressé */
+        }
+
+        QSlider::sub-page:horizontal:disabled {
+            background: #E2E8F0;
+            border-radius: 3px;
+        }
+
+        QSlider::add-page:horizontal:disabled {
+            background: #F7FAFC;
+            border-radius: 3px;
+        }
+
+        QSlider::handle:horizontal:disabled {
+            background: #CBD5E0;
+            border-radius: 8px;
+        }     
+        """
+    
+class AcquisitionWindow(QMainWindow):
+    def __init__(self, temperature):
+        super().__init__()
+        self.chosen_temperature = temperature
+        self.init_ui(temperature)
+
+    def init_ui(self, temperature):
+        super().__init__()
+        self.setWindowTitle("Data Acquisition")
+        self.setGeometry(100, 100, 1000, 800)
+        apply_shared_stylesheet()
+        self.setStyleSheet(self.get_stylesheet())
+
+        # Main layout with margins
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(10)
+        
+        # Title section with subtitle
+        title_widget = QWidget()
+        title_layout = QVBoxLayout()
+
+        # Logo/Icon
+        logo_label = QLabel("📊")
+        logo_label.setStyleSheet("font-size: 32px;")
+        title_layout.addWidget(logo_label)
+
+        title_label = QLabel("Data Acquisition")
+        title_label.setStyleSheet("font-size: 32px; font-weight: bold; color: #2D3748;")
+
+        subtitle_label = QLabel("Real-time data collection and visualisation")
+        subtitle_label.setStyleSheet("font-size: 16px; color: #718096;")
+
+        title_layout.addWidget(title_label)
+        title_layout.addWidget(subtitle_label)
+        title_layout.setSpacing(5)
+
+        title_widget.setLayout(title_layout)
+
+        # Temperature display section
+        temperature_widget = QWidget()
+        temperature_layout = QHBoxLayout()
+
+        self.flow_buffer = SampleBuffer()
+        self.flow = DataCollector(BROKER_ADDRESS, ESP2_TOPIC_DATAFLOW, self.flow_buffer)
+
+        temperature_label = QLabel("Wind value in the pipe:")
+        temperature_label.setStyleSheet("font-size: 16px; color: #2D3748;")
+
+        self.current_temperature_label = QLabel("0 m/s")
+        self.current_temperature_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #E53E3E;")
+
+        temperature_layout.addWidget(temperature_label)
+        temperature_layout.addWidget(self.current_temperature_label)
+        temperature_layout.addStretch()  # Pushes everything to the left
+        temperature_widget.setLayout(temperature_layout)
+
+        # Combine title and temperature sections in a single horizontal layout
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(title_widget)
+        header_layout.addStretch()  # Adds spacing between title and temperature
+        header_layout.addWidget(temperature_widget)
+
+        # Add the header layout to the main widget
+        header_widget = QWidget()
+        header_widget.setLayout(header_layout)
+
+        layout.addWidget(header_widget)
+
+        # Charts cardy 
+        charts_card = QWidget()
+        charts_card.setProperty("class", "card")
+        charts_layout = QVBoxLayout()
+        charts_layout.setSpacing(10)
+        charts_layout.setContentsMargins(10, 20, 10, 25)
+
+        charts_title = QLabel("Real-time temperature graph")
+        charts_title.setStyleSheet("font-size: 20px; font-weight: bold; color: #2D3748; margin-bottom: 20px; margin-left: 25px;")
+        charts_layout.addWidget(charts_title)
+
+        from PyQt5.QtChart import QChartView
+        self.chart_view = QChartView()
+        self.chart_view.setRenderHint(QPainter.Antialiasing)
+        self.chart_view.setMinimumHeight(300)
+        charts_layout.addWidget(self.chart_view)
+
+        charts_card.setLayout(charts_layout)
+        layout.addWidget(charts_card)
+
+        # Control buttons
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+
+        self.back_button = QPushButton("Back to Menu")
+        self.start_button = QPushButton("Start")
+
+        for button in [self.back_button, self.start_button]:
+            button.setFixedSize(200, 50)
+            button_layout.addWidget(button)
+
+        layout.addLayout(button_layout)
+
+        # Footer
+        footer_label = QLabel("© 2025 - INSA Toulouse")
+        footer_label.setAlignment(Qt.AlignCenter)
+        footer_label.setStyleSheet("color: #A0AEC0; font-size: 12px;")
+        layout.addWidget(footer_label)
+
+        # Set up central widget
+        central_widget = QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+
+        # Initialize charts and connect buttons
+        self.initialize_chart()
+        self.connect_buttons()
+        
+        # Backend setup
+        self.temperature_buffer = SampleBuffer()
+        self.collector = DataCollector(BROKER_ADDRESS, ESP2_TOPIC_DATATEMP, self.temperature_buffer)
+
+        self.update_pump = UiUpdatePump(parent=self)
+        self.update_pump.add_source(self.temperature_buffer, self.update_data)
+        self.update_pump.add_source(self.flow_buffer, self.update_dataflow)
+        self.update_pump.start()
+
+        self.data = []
+        self.time_counter = 0
+
+    def closeEvent(self, event):
+        # Libère les abonnements sur la connexion MQTT partagée
+        self.update_pump.stop()
+        self.flow.close()
+        self.collector.close()
+        super().closeEvent(event)
+
+    def get_stylesheet(self):
+        return """
+        QWidget[class="card"] {
+            margin-bottom: 20px;
+        }
+
+        QLineEdit {
+            padding: 8px;
+            border: 1px solid #E2E8F0;
+            border-radius: 8px;
+            background-color: white;
+            color: #2D3748;
+            font-size: 14px;
+        }
+
+        QLineEdit:focus {
+            border: 2px solid #C17817;
+            outline: none;
+        }
+
+        QTableWidget {
+            border: none;
+            background-color: white;
+            gridline-color: #E2E8F0;
+        }
+
+        QTableWidget::item {
+            padding: 8px;
+            border-bottom: 1px solid #E2E8F0;
+        }
+
+        QHeaderView::section {
+            background-color: #F7FAFC;
+            padding: 8px;
+            border: none;
+            border-bottom: 2px solid #E2E8F0;
+            font-weight: bold;
+            color: #2D3748;
+        }
+
+        QScrollArea {
+            border: none;
+            background-color: transparent;
+        }
+
+        QScrollBar:vertical {
+            border: none;
+            background: #E2E8F0;
+            width: 10px;
+            border-radius: 5px;
+        }
+
+        QScrollBar::handle:vertical {
+            background: #CBD5E0;
+            border-radius: 5px;
+        }
+
+        QScrollBar::add-line:vertical,
+        QScrollBar::sub-line:vertical {
+            border: none;
+            background: none;
+        }
+        """
+
+    def open_acquisition_after_brick_window(self):
+        # Un second clic ramène la fenêtre déjà ouverte au lieu d'en créer une autre
+        show_window(AcquisitionWindowAfterBrick)
+        #self.close()
+      
+    def initialize_chart(self):
+        from PyQt5.QtChart import QChart, QLineSeries, QValueAxis
+
+        # Créer la série pour la température
+        self.temperature_series = QLineSeries()
+        self.temperature_points = DecimatedSeries()
+        self.temperature_series.setName("Temperature in the pipe")
+        self.temperature_series.setPen(QPen(QColor(255, 0, 0), 2))
+
+        # Créer la ligne pour la température choisie
+        self.chosen_temp_series = QLineSeries()
+        self.temperature_series.setName("Wanted Temperature")
+        self.chosen_temp_series.setPen(QPen(QColor(0, 0, 255), 2, Qt.DashLine))
+
+        # Créer le graphique
+        chart = QChart()
+        chart.setTitle("Temperature (°C)")
+        chart.addSeries(self.temperature_series)
+        chart.addSeries(self.chosen_temp_series)
+
+        # Créer les axes
+        axis_x = QValueAxis()
+        axis_x.setTitleText("Time (s)")
+        axis_x.setRange(0, 100)  # Plage du temps à ajuster au besoin
+        chart.addAxis(axis_x, Qt.AlignBottom)
+
+        axis_y = QValueAxis()
+        axis_y.setTitleText("Temperature (°C)")
+        axis_y.setRange(15, 55)  # Ajustez cette plage selon vos besoins
+        chart.addAxis(axis_y, Qt.AlignLeft)
+
+        chart.setAxisX(axis_x, self.temperature_series)
+        chart.setAxisY(axis_y, self.temperature_series)
+        chart.setAxisX(axis_x, self.chosen_temp_series)
+        chart.setAxisY(axis_y, self.chosen_temp_series)
+
+        # Ajouter la ligne de température choisie
+        self.chosen_temp_series.append(0, self.chosen_temperature)
+        self.chosen_temp_series.append(100, self.chosen_temperature)
+
+        # Définir le graphique pour la vue
+        self.chart_view.setChart(chart)
+
+
+    def update_data(self, samples):
+        # Un seul replace() et un seul changement d'axe par image
+        last_time = None
+        for _, new_data in samples:
+            if 'temperature' in new_data:
+                self.temperature_points.append(self.time_counter, new_data['temperature'])
+                last_time = self.time_counter
+                self.time_counter += 1
+        if last_time is None:
+            return
+        chart = self.chart_view.chart()
+        # Environ un point par pixel horizontal de la zone de tracé
+        plot_width = int(chart.plotArea().width())
+        if plot_width > 0 and plot_width != self.temperature_points.target_points:
+            self.temperature_points.set_target_points(plot_width)
+        self.temperature_series.replace(self.temperature_points.points())
+        chart.axisX().setRange(max(0, last_time - 100), last_time)
+
+    def update_dataflow(self, samples):
+        # Seule la dernière valeur reçue est affichée
+        for _, new_data in reversed(samples):
+            if 'flow' in new_data:
+                self.current_temperature_label.setText(f"{new_data['flow']*3.6} km/h")
+                break
+
+
+    def create_parameter_form(self):
+        # Formulaire pour les paramètres
+        self.param_form = QFormLayout()
+        self.param_form.setSpacing(15)
+
+        h_layout = QHBoxLayout()
+
+        self.input_temp = QLineEdit()
+        self.input_pressure = QLineEdit()
+        self.input_humidity = QLineEdit()
+
+        label_temp = QLabel("Temperature (°C):")
+        label_pressure = QLabel("Wind speed (km/h):")
+        label_humidity = QLabel("Humidity (%):")
+
+        h_layout.addWidget(label_temp)
+        h_layout.addWidget(self.input_temp)
+        h_layout.addWidget(label_pressure)
+        h_layout.addWidget(self.input_pressure)
+        h_layout.addWidget(label_humidity)
+        h_layout.addWidget(self.input_humidity)
+
+        self.param_form.addRow(h_layout)
+
+        param_widget = QWidget()
+        param_layout = QVBoxLayout()
+        param_layout.addLayout(self.param_form)
+        param_widget.setLayout(param_layout)
+        self.layout.addWidget(param_widget)
+
+    def create_data_table(self):
+        # Tableau pour afficher les données
+        self.data_table = QTableWidget()
+        self.data_table.setColumnCount(3)
+        self.data_table.setHorizontalHeaderLabels(["Temperature (°C)", "Wind speed (km/h)", "Humidity (%)"])
+        self.data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+        self.layout.addWidget(self.data_table)
+
+    def create_chart_container(self):
+        # Créer un conteneur de défilement pour les graphiques
+        self.chart_scroll_area = QScrollArea()
+        self.chart_container = QWidget()
+        self.chart_layout = QVBoxLayout()
+        self.chart_container.setLayout(self.chart_layout)
+        
+        self.chart_scroll_area.setWidgetResizable(True)
+        self.chart_scroll_area.setWidget(self.chart_container)
+        
+        self.layout.addWidget(self.chart_scroll_area)
+        
+        # Initialiser les dictionnaires pour les graphiques
+        self.chart_views = {}
+        self.series_dict = {}
+        
+        # Créer le premier graphique initial
+        self.initialize_charts()
+    
+    def connect_buttons(self):
+        self.start_button.clicked.connect(self.open_acquisition_after_brick_window)
+        self.back_button.clicked.connect(self.open_home_window)
+
+    def open_home_window(self):
+        show_window(HomeWindow)
+        self.close()
+
+    def open_acquisition_window(self):
+        self.acquisition_window = AcquisitionWindow()
+        self.acquisition_window.show()
+        self.close()
+
+class AcquisitionWindowAfterBrick(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Data Acquisition")
+        self.setGeometry(100, 100, 1500, 1200)
+        apply_shared_stylesheet()
+        self.setStyleSheet(self.get_stylesheet())
+
+        # Main layout with margins
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(10)
+
+        # Header section
+        header_widget = QWidget()
+        header_layout = QHBoxLayout()
+        
+        # Logo/Icon
+        logo_label = QLabel("📊")
+        logo_label.setStyleSheet("font-size: 32px;")
+        header_layout.addWidget(logo_label)
+
+        # Title section with subtitle
+        title_widget = QWidget()
+        title_layout = QVBoxLayout()
+        
+        title_label = QLabel("Data Acquisition")
+        title_label.setStyleSheet("font-size: 32px; font-weight: bold; color: #2D3748;")
+        
+        subtitle_label = QLabel("Real-time data collection and visualisation")
+        subtitle_label.setStyleSheet("font-size: 16px; color: #718096;")
+        
+        title_layout.addWidget(title_label)
+        title_layout.addWidget(subtitle_label)
+        title_layout.setSpacing(5)
+        
+        title_widget.setLayout(title_layout)
+        header_layout.addWidget(title_widget)
+        header_layout.addStretch()
+
+        # Refresh rate and pending samples readout
+        self.ui_stats_label = QLabel("-- fps · queue 0")
+        self.ui_stats_label.setStyleSheet("font-size: 14px; color: #718096;")
+        header_layout.addWidget(self.ui_stats_label)
+        
+        header_widget.setLayout(header_layout)
+        layout.addWidget(header_widget)
+
+        # Create a horizontal splitter for data tables and charts
+        content_splitter = QSplitter(Qt.Horizontal)
+
+        # Left side: Two data cards
+        left_widget = QWidget()
+        left_layout = QVBoxLayout()
+
+        # Update the first table (index 0)
+        # experiment_window.update_data(0, {'temperature': 26.0, 'pressure': 1014.0, 'humidity': 51.0})
+
+        # Update the second table (index 1)
+        # experiment_window.update_data(1, {'temperature': 27.0, 'pressure': 1015.0, 'humidity': 52.0})
+
+        # Columnar ring buffers backing the data tables
+        self.store_before = SampleStore()
+        self.store_after = SampleStore()
+        self.model_before = SampleTableModel(self.store_before, self)
+        self.model_after = SampleTableModel(self.store_after, self)
+        # ΔT, gain d'humidité et efficacité calculés par le StreamJoiner
+        self.store_derived = SampleStore(columns=DERIVED_COLUMNS)
+
+        # First data card
+        self.data_table_before_brick = self.create_data_card("Collected Data Before Brick", self.model_before)
+        left_layout.addWidget(self.data_table_before_brick)
+
+        # Second data card
+        self.data_table_after_brick = self.create_data_card("Collected Data After Brick", self.model_after)
+        left_layout.addWidget(self.data_table_after_brick)
+        left_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        left_widget.setLayout(left_layout)
+        content_splitter.addWidget(left_widget)
+
+        # Right side: Charts card
+        charts_card = QWidget()
+        charts_card.setProperty("class", "card")
+        charts_layout = QVBoxLayout()
+        charts_layout.setSpacing(10)
+        charts_layout.setContentsMargins(10, 20, 10, 25)
+
+        charts_title = QLabel("Real-time Charts")
+        charts_title.setStyleSheet("font-size: 20px; font-weight: bold; color: #2D3748; margin-bottom: 20px; margin-left: 25px;")
+        charts_layout.addWidget(charts_title)
+
+        self.chart_scroll_area = QScrollArea()
+        self.chart_container = QWidget()
+        self.chart_layout = QVBoxLayout()
+        self.chart_container.setLayout(self.chart_layout)
+        self.chart_scroll_area.setWidgetResizable(True)
+        self.chart_scroll_area.setWidget(self.chart_container)
+        charts_layout.addWidget(self.chart_scroll_area)
+
+        charts_card.setLayout(charts_layout)
+        charts_card.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        content_splitter.addWidget(charts_card)
+
+        # Set initial sizes for the splitter
+        content_splitter.setSizes([int(self.width() * 0.4), int(self.width() * 0.6)])
+        content_splitter.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        layout.addWidget(content_splitter)
+
+        # Control buttons
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+
+        self.start_button = QPushButton("Start")
+        self.stop_button = QPushButton("Stop")
+        self.clear_button = QPushButton("Clear")
+        self.export_button = QPushButton("Export Data")
+        self.resume_button = QPushButton("Resume Session")
+        self.diagnostics_button = QPushButton("Diagnostics")
+        self.back_button = QPushButton("Close")
+
+        for button in [self.back_button, self.diagnostics_button, self.resume_button, self.export_button,
+                        self.clear_button, self.stop_button, self.start_button]:
+            button.setFixedSize(150, 40)
+            button_layout.addWidget(button)
+
+        layout.addLayout(button_layout)
+
+        # Footer
+        footer_label = QLabel("© 2025 - INSA Toulouse")
+        footer_label.setAlignment(Qt.AlignCenter)
+        footer_label.setStyleSheet("color: #A0AEC0; font-size: 12px;")
+        layout.addWidget(footer_label)
+
+        # Set up central widget
+        central_widget = QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+
+        # Initialize charts and connect buttons
+        self.initialize_charts()
+        self.connect_buttons()
+        self.initialize_backend()
+        
+
+    def get_stylesheet(self):
+        return """
+        QWidget[class="card"] {
+            margin-bottom: 20px;
+        }
+
+        QLineEdit {
+            padding: 8px;
+            border: 1px solid #E2E8F0;
+            border-radius: 8px;
+            background-color: white;
+            color: #2D3748;
+            font-size: 14px;
+        }
+
+        QLineEdit:focus {
+            border: 2px solid #C17817;
+            outline: none;
+        }
+
+        QTableView {
+            border: none;
+            background-color: white;
+            gridline-color: #E2E8F0;
+        }
+
+        QTableView::item {
+            padding: 8px;
+            border-bottom: 1px solid #E2E8F0;
+        }
+
+        QHeaderView::section {
+            background-color: #F7FAFC;
+            padding: 8px;
+            border: none;
+            border-bottom: 2px solid #E2E8F0;
+            font-weight: bold;
+            color: #2D3748;
+        }
+
+        QScrollArea {
+            border: none;
+            background-color: transparent;
+        }
+
+        QScrollBar:vertical {
+            border: none;
+            background: #E2E8F0;
+            width: 10px;
+            border-radius: 5px;
+        }
+
+        QScrollBar::handle:vertical {
+            background: #CBD5E0;
+            border-radius: 5px;
+        }
+
+        QScrollBar::add-line:vertical,
+        QScrollBar::sub-line:vertical {
+            border: none;
+            background: none;
+        }
+        """
+    def create_data_card(self, title, model):
+        data_card = QTableView()
+        data_card.setProperty("class", "card")
+        data_card.setModel(model)
+        data_card.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # Fixed row height so the view never measures rows outside the viewport
+        data_card.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        return data_card
+    # def create_data_card(self, title):
+    #     data_card = QWidget()
+    #     data_card.setProperty("class", "card")
+
+
+    #     data_title = QLabel(title)
+    #     data_title.setStyleSheet("font-size: 20px; font-weight: bold; color: #2D3748; margin-bottom: 20px; margin-left: 25px;")
+    #     data_layout.addWidget(data_title)
+
+    #     data_table = QTableWidget()
+    #     data_table.setColumnCount(3)
+    #     data_table.setHorizontalHeaderLabels(["Temperature (°C)", "Pressure (hPa)", "Humidity (%)"])
+    #     data_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+    #     data_layout.addWidget(data_table)
+    #     data_card.setLayout(data_layout)
+    #     return data_card
+
+    def initialize_charts(self):
+        from PyQt5.QtChart import QChart, QChartView, QLineSeries, QValueAxis
+
+        self.series_before = {}
+        self.series_after = {}
+        self.points_before = {}
+        self.points_after = {}
+        self.series_derived = {}
+        self.points_derived = {}
+        self.chart_points = {}
+        self.axes_x = {}
+        self.chart_views = {}
+
+        self.chart_layout.setSpacing(0)  # Espacement global entre tous les graphiques
+
+        metrics = ["temperature", "pressure", "humidity"]
+
+        self.metric_configs = {
+            "temperature": {"color": QColor(255, 0, 0), "range": (15, 35), "title": "Température (°C)"},
+            "pressure": {"color": QColor(0, 0, 255), "range": (900, 1100), "title": "Pression (hPa)"},
+            "humidity": {"color": QColor(0, 255, 0), "range": (25, 80), "title": "Humidité (%)"}
+        }
+
+        for metric in metrics:
+            # Create series for before and after brick
+            self.series_before[metric] = QLineSeries()
+            self.series_after[metric] = QLineSeries()
+            self.points_before[metric] = DecimatedSeries()
+            self.points_after[metric] = DecimatedSeries()
+            self.series_before[metric].setName("Before brick")
+            self.series_after[metric].setName("After brick")
+            self.chart_points[metric] = [self.points_before[metric], self.points_after[metric]]
+
+            chart = QChart()
+            chart.setTitle(self.metric_configs[metric]['title'])
+            chart.addSeries(self.series_before[metric])
+            chart.addSeries(self.series_after[metric])
+            chart.setTitle(f"{metric.capitalize()} Over Time")
+
+            axis_x = QValueAxis()
+            axis_x.setTitleText("Time (s)")
+            axis_x.setRange(0, 100)
+            chart.addAxis(axis_x, Qt.AlignBottom)
+            self.axes_x[metric] = axis_x
+
+            axis_y = QValueAxis()
+            axis_y.setTitleText(self.metric_configs[metric]['title'])
+            axis_y.setRange(*self.metric_configs[metric]['range'])
+            chart.addAxis(axis_y, Qt.AlignLeft)
+
+            self.series_before[metric].attachAxis(axis_x)
+            self.series_before[metric].attachAxis(axis_y)
+            self.series_after[metric].attachAxis(axis_x)
+            self.series_after[metric].attachAxis(axis_y)
+
+            # Créer la vue du graphique
+            chart_view = QChartView(chart)
+            chart_view.setRenderHint(QPainter.Antialiasing)
+            chart_view.setMinimumHeight(300)
+
+            # Ajouter la vue à la disposition et stocker
+            self.chart_layout.addWidget(chart_view)
+            self.chart_views[metric] = chart_view
+
+        # Grandeurs dérivées des deux flux alignés
+        self.derived_configs = {
+            "delta_temperature": {"range": (-5, 15), "title": "ΔT avant - après (°C)"},
+            "humidity_gain": {"range": (-10, 40), "title": "Gain d'humidité (%)"},
+            "efficiency": {"range": (0, 100), "title": "Efficacité évaporative (%)"}
+        }
+
+        for metric, config in self.derived_configs.items():
+            self.series_derived[metric] = QLineSeries()
+            self.points_derived[metric] = DecimatedSeries()
+            self.chart_points[metric] = [self.points_derived[metric]]
+
+            chart = QChart()
+            chart.addSeries(self.series_derived[metric])
+            chart.setTitle(config['title'])
+            chart.legend().hide()
+
+            axis_x = QValueAxis()
+            axis_x.setTitleText("Time (s)")
+            axis_x.setRange(0, 100)
+            chart.addAxis(axis_x, Qt.AlignBottom)
+            self.axes_x[metric] = axis_x
+
+            axis_y = QValueAxis()
+            axis_y.setTitleText(config['title'])
+            axis_y.setRange(*config['range'])
+            chart.addAxis(axis_y, Qt.AlignLeft)
+
+            self.series_derived[metric].attachAxis(axis_x)
+            self.series_derived[metric].attachAxis(axis_y)
+
+            chart_view = QChartView(chart)
+            chart_view.setRenderHint(QPainter.Antialiasing)
+            chart_view.setMinimumHeight(300)
+
+            self.chart_layout.addWidget(chart_view)
+            self.chart_views[metric] = chart_view
+
+    def initialize_backend(self):
+        # Chaque DataCollector alimente la session du processus (SessionRecorder.active)
+        self.buffer_before = SampleBuffer()
+        self.buffer_after = SampleBuffer()
+        self.collector_before = DataCollector(BROKER_ADDRESS, ESP2_TOPIC_DATA, self.buffer_before)
+        self.collector_after = DataCollector(BROKER_ADDRESS, ESP1_TOPIC_DATA, self.buffer_after)
+        # Les deux ESP publient à des cadences différentes : les échantillons sont horodatés
+        # et placés sur un axe commun en secondes depuis le début de la session
+        self.joiner = StreamJoiner()
+        self.session_start = None
+        self.last_timestamp = None
+        self.rebase_pending = False
+
+        # Courbes, séries décimées et modèle de tableau de chaque flux ; un groupe
+        # modifié est redessiné au prochain render_charts()
+        self.chart_groups = {
+            "before": (self.series_before, self.points_before, self.model_before),
+            "after": (self.series_after, self.points_after, self.model_after),
+            "derived": (self.series_derived, self.points_derived, None),
+        }
+        self.dirty_charts = set()
+
+        self.update_pump = UiUpdatePump(parent=self)
+        self.update_pump.add_source(self.buffer_before, lambda samples: self.update_data("before", samples))
+        self.update_pump.add_source(self.buffer_after, lambda samples: self.update_data("after", samples))
+        self.update_pump.stats_updated.connect(self.update_ui_stats)
+        self.update_pump.start()
+
+        # État lu par le panneau de diagnostic
+        METRICS.add_source("ui", self.diagnostics)
+
+    def diagnostics(self):
+        return {
+            "frame_rate": self.update_pump.frame_rate,
+            "queue_depth": self.update_pump.queue_depth,
+            "pending_joins": len(self.joiner.pending_after),
+            "joined_samples": self.store_derived.spilled + len(self.store_derived),
+        }
+
+    def closeEvent(self, event):
+        # Un export en cours lit encore les fichiers de débordement des SampleStore :
+        # on l'annule et on attend seulement qu'il atteigne son prochain point d'arrêt
+        if getattr(self, "export_worker", None) is not None:
+            self.export_worker.cancel()
+            self.export_worker.wait()
+        # Libère les abonnements sur la connexion MQTT partagée
+        self.update_pump.stop()
+        self.collector_before.close()
+        self.collector_after.close()
+        self.store_before.close()
+        self.store_after.close()
+        self.store_derived.close()
+        METRICS.remove_source("ui")
+        forget_window(self)
+        super().closeEvent(event)
+
+    def update_data(self, source, samples):
+        # Appelé une fois par image avec tous les échantillons reçus depuis la précédente
+        self.ingest_samples([(source, sample) for sample in samples])
+        self.render_charts()
+
+    def ingest_samples(self, samples):
+        # Alimente tableaux, StreamJoiner et séries décimées sans toucher aux graphiques Qt.
+        # `samples` contient des (source, (received_at, data)) dans l'ordre de réception.
+        by_source = {"before": [], "after": []}
+        derived = []
+        for source, (received_at, data) in samples:
+            if not data:
+                continue
+            timestamp = sample_time(received_at, data)
+            if self.session_start is None:
+                self.session_start = timestamp
+            elif self.rebase_pending:
+                # Première mesure en direct après une reprise : l'origine est décalée de la
+                # durée de l'interruption pour que la courbe continue après le dernier point relu
+                self.session_start += max(0.0, timestamp - self.last_timestamp)
+            self.rebase_pending = False
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+            by_source[source].append((timestamp, data))
+            if source == "before":
+                derived.extend(self.joiner.add_before(timestamp, data))
+            else:
+                derived.extend(self.joiner.add_after(timestamp, data))
+
+        for source, source_samples in by_source.items():
+            if source_samples:
+                self.chart_groups[source][2].append_samples(source_samples)
+                self.append_points(self.chart_groups[source][1], source_samples)
+                self.dirty_charts.add(source)
+        if derived:
+            self.store_derived.extend(self.store_derived.spill_overflow(derived))
+            self.append_points(self.points_derived, derived)
+            self.dirty_charts.add("derived")
+
+    def append_points(self, points_dict, samples):
+        for timestamp, data in samples:
+            elapsed = timestamp - self.session_start
+            for metric, points in points_dict.items():
+                value = data.get(metric)
+                # Les valeurs manquantes ou non définies (efficacité sans dépression) ne sont pas tracées
+                if value is not None and not math.isnan(value):
+                    points.append(elapsed, value)
+
+    def render_charts(self):
+        # Redessine uniquement les groupes de courbes modifiés depuis le dernier rendu
+        if not self.dirty_charts:
+            return
+        for group in self.dirty_charts:
+            series_dict, points_dict, model = self.chart_groups[group]
+            for metric, series in series_dict.items():
+                # Environ un point par pixel horizontal de la zone de tracé
+                points = points_dict[metric]
+                plot_width = int(self.chart_views[metric].chart().plotArea().width())
+                if plot_width > 0 and plot_width != points.target_points:
+                    points.set_target_points(plot_width)
+                series.replace(points.points())
+        if "before" in self.dirty_charts:
+            self.data_table_before_brick.scrollToBottom()
+        if "after" in self.dirty_charts:
+            self.data_table_after_brick.scrollToBottom()
+        self.dirty_charts.clear()
+        self.update_time_axes()
+
+    def update_time_axes(self):
+        for metric, axis_x in self.axes_x.items():
+            decimated = self.chart_points[metric]
+            first = [points.first_x() for points in decimated if points.first_x() is not None]
+            last = [points.last_x() for points in decimated if points.last_x() is not None]
+            if first:
+                start = min(first)
+                axis_x.setRange(start, max(start + 100, max(last)))
+
+    def update_ui_stats(self, frame_rate, queue_depth):
+        self.ui_stats_label.setText(f"{frame_rate:.0f} fps · queue {queue_depth}")
+
+    def connect_buttons(self):
+        self.start_button.clicked.connect(self.start_collecting)
+        self.stop_button.clicked.connect(self.stop_collecting)
+        self.clear_button.clicked.connect(self.clear_data)
+        self.export_button.clicked.connect(self.export_data)
+        self.resume_button.clicked.connect(self.resume_session)
+        self.diagnostics_button.clicked.connect(lambda: show_window(DiagnosticsWindow))
+        self.back_button.clicked.connect(self.close)
+
+    def start_collecting(self):
+        service = MqttService.instance()
+        service.publish(ESP1_TOPIC_CONTROL, "START", COMMAND_QOS)
+        service.publish(ESP2_TOPIC_CONTROL, "START", COMMAND_QOS)
+        print("Started collecting data")
+
+    def stop_collecting(self):
+        service = MqttService.instance()
+        service.publish(ESP1_TOPIC_CONTROL, "STOP", COMMAND_QOS)
+        service.publish(ESP2_TOPIC_CONTROL, "STOP", COMMAND_QOS)
+        print("Stopped collecting data")
+
+    def clear_data(self):
+        self.model_before.clear()
+        self.model_after.clear()
+        for series in self.series_before.values():
+            series.clear()
+        for series in self.series_after.values():
+            series.clear()
+        for points in self.points_before.values():
+            points.clear()
+        for points in self.points_after.values():
+            points.clear()
+        for series in self.series_derived.values():
+            series.clear()
+        for points in self.points_derived.values():
+            points.clear()
+        self.store_derived.clear()
+        self.joiner.clear()
+        self.session_start = None
+        self.last_timestamp = None
+        self.rebase_pending = False
+        self.dirty_charts.clear()
+
+    def resume_session(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Reprendre une session", SESSION_DIRECTORY, "Session Files (*.jsonl)")
+        if not file_path or os.path.abspath(file_path) == os.path.abspath(SessionRecorder.shared().path):
+            return
+
+        # Continuer à enregistrer dans le même fichier, puis relire ce qu'il contenait
+        SessionRecorder.repair(file_path)
+        end = os.path.getsize(file_path)
+        SessionRecorder.start_session(file_path)
+
+        self.clear_data()
+        # Relecture en flux dans l'ordre du fichier, pour que le StreamJoiner voie les deux
+        # flux entrelacés ; les graphiques ne sont redessinés qu'une fois à la fin
+        sources = {ESP2_TOPIC_DATA: "before", ESP1_TOPIC_DATA: "after"}
+        batch = []
+        count = 0
+        for record in SessionRecorder.replay(file_path, end):
+            source = sources.get(record["topic"])
+            if source is None:
+                continue
+            batch.append((source, (record["t"], record["data"])))
+            if len(batch) >= REPLAY_BATCH_SIZE:
+                self.ingest_samples(batch)
+                count += len(batch)
+                batch = []
+        self.ingest_samples(batch)
+        count += len(batch)
+        self.rebase_pending = self.last_timestamp is not None
+        self.render_charts()
+        print(f"Session reprise : {count} messages relus depuis {file_path}")
+
+    def export_data(self):
+        # Ouvrir une boîte de dialogue pour choisir l'emplacement du fichier zip
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getSaveFileName(self, "Exporter les Données et Graphique", "", "Zip Files (*.zip)", options=options)
+        
+        if not file_path:
+            return
+        # Vérifier si le chemin sélectionné a l'extension .zip
+        if not file_path.endswith('.zip'):
+            file_path += '.zip'
+
+        # Les widgets Qt ne sont utilisables que depuis ce thread : on y fige les données
+        # et on y dessine les graphiques, le reste de l'export se fait dans un ExportWorker
+        snapshots = {"before": self.store_before.snapshot(), "after": self.store_after.snapshot(),
+                     "derived": self.store_derived.snapshot()}
+        chart_images = self.render_chart_images(*EXPORT_IMAGE_SIZE)
+
+        self.export_worker = ExportWorker(file_path, snapshots, chart_images, self)
+        self.export_progress = QProgressDialog("Export en cours...", "Annuler", 0, 100, self)
+        self.export_progress.setWindowTitle("Export")
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.export_finished.connect(self.on_export_finished)
+        self.export_worker.export_failed.connect(self.on_export_failed)
+        self.set_export_running(True)
+        self.export_worker.start()
+
+    def set_export_running(self, running):
+        # Clear et Resume suppriment les fichiers de débordement que l'export est en train de lire
+        for button in [self.export_button, self.clear_button, self.resume_button]:
+            button.setEnabled(not running)
+
+    def render_chart_images(self, width, height):
+        # Dessine chaque graphique à la taille d'export sans redimensionner sa vue
+        images = {}
+        for metric, chart_view in self.chart_views.items():
+            chart = chart_view.chart()
+            original_size = chart.size()
+            chart.resize(QSizeF(width, height))
+
+            image = QImage(width, height, QImage.Format_ARGB32)
+            image.fill(Qt.white)
+            painter = QPainter(image)
+            painter.setRenderHint(QPainter.Antialiasing)
+            chart.scene().render(painter, QRectF(0, 0, width, height), QRectF(chart.pos(), QSizeF(width, height)))
+            painter.end()
+
+            chart.resize(original_size)
+            images[metric] = image
+        return images
+
+    def on_export_progress(self, value, message):
+        self.export_progress.setLabelText(message)
+        self.export_progress.setValue(value)
+
+    def on_export_finished(self, file_path):
+        self.export_progress.reset()
+        self.set_export_running(False)
+        print(f"Les données et les graphiques ont été exportés dans le fichier zip: {file_path}")
+
+    def on_export_failed(self, message):
+        self.export_progress.reset()
+        self.set_export_running(False)
+        print(message)
+
+# Rafraîchissement du panneau de diagnostic
+DIAGNOSTICS_REFRESH_MS = 1000
+
+
+class DiagnosticsWindow(QMainWindow):
+    # Compteurs, histogrammes et état des services, relus une fois par seconde
+    # tant que la fenêtre est visible
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Diagnostics")
+        self.setGeometry(150, 150, 1100, 900)
+        apply_shared_stylesheet()
+        self.setStyleSheet(self.get_stylesheet())
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(10)
+
+        title_label = QLabel("Diagnostics")
+        title_label.setStyleSheet("font-size: 32px; font-weight: bold; color: #2D3748;")
+        layout.addWidget(title_label)
+
+        subtitle_label = QLabel("Message rates, decoding cost and latencies")
+        subtitle_label.setStyleSheet("font-size: 16px; color: #718096;")
+        layout.addWidget(subtitle_label)
+
+        options_layout = QHBoxLayout()
+        self.enable_checkbox = QCheckBox("Instrumentation enabled")
+        self.enable_checkbox.setChecked(METRICS.enabled)
+        self.enable_checkbox.toggled.connect(self.set_enabled)
+        options_layout.addWidget(self.enable_checkbox)
+        options_layout.addStretch()
+        self.elapsed_label = QLabel()
+        self.elapsed_label.setStyleSheet("color: #718096;")
+        options_layout.addWidget(self.elapsed_label)
+        layout.addLayout(options_layout)
+
+        self.counter_table = self.create_table(["Counter", "Total", "Rate (/s)"])
+        self.histogram_table = self.create_table(["Histogram", "Count", "Mean (ms)", "P50 (ms)",
+                                                  "P90 (ms)", "P99 (ms)", "Max (ms)"])
+        self.source_table = self.create_table(["Source", "Value"])
+        for table in [self.counter_table, self.histogram_table, self.source_table]:
+            layout.addWidget(table)
+
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(20)
+        self.reset_button = QPushButton("Reset")
+        self.save_button = QPushButton("Save...")
+        self.close_button = QPushButton("Close")
+        for button in [self.close_button, self.save_button, self.reset_button]:
+            button.setFixedSize(150, 40)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+
+        self.reset_button.clicked.connect(self.reset_metrics)
+        self.save_button.clicked.connect(self.save_metrics)
+        self.close_button.clicked.connect(self.close)
+
+        central_widget = QWidget()
+        central_widget.setLayout(layout)
+        self.setCentralWidget(central_widget)
+
+        self.previous_counters = {}
+        self.previous_time = None
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(DIAGNOSTICS_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def get_stylesheet(self):
+        return """
+        QTableWidget {
+            border: none;
+            background-color: white;
+            gridline-color: #E2E8F0;
+        }
+
+        QHeaderView::section {
+            background-color: #F7FAFC;
+            padding: 8px;
+            border: none;
+            border-bottom: 2px solid #E2E8F0;
+            font-weight: bold;
+            color: #2D3748;
+        }
+        """
+
+    def create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        table.verticalHeader().hide()
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        return table
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def set_enabled(self, enabled):
+        METRICS.enabled = enabled
+        self.refresh()
+
+    def reset_metrics(self):
+        METRICS.reset()
+        self.previous_counters = {}
+        self.refresh()
+
+    def save_metrics(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Enregistrer les métriques", "metrics.json", "JSON Files (*.json)")
+        if not file_path:
+            return
+        try:
+            METRICS.dump(file_path)
+        except OSError as e:
+            print(f"Erreur lors de l'enregistrement des métriques : {e}")
+        else:
+            print(f"Métriques enregistrées dans {file_path}")
+
+    def refresh(self):
+        snapshot = METRICS.snapshot()
+        now = snapshot["time"]
+        interval = now - self.previous_time if self.previous_time is not None else 0
+
+        rows = []
+        for name, value in snapshot["counters"].items():
+            previous = self.previous_counters.get(name)
+            rate = (value - previous) / interval if previous is not None and interval > 0 else None
+            rows.append([name, str(value), f"{rate:.1f}" if rate is not None else "-"])
+        self.fill_table(self.counter_table, rows)
+        self.previous_counters = snapshot["counters"]
+        self.previous_time = now
+
+        rows = []
+        for name, summary in snapshot["histograms"].items():
+            row = [name, str(summary["count"])]
+            for key in ["mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"]:
+                row.append(f"{summary[key]:.3f}" if key in summary else "-")
+            rows.append(row)
+        self.fill_table(self.histogram_table, rows)
+
+        rows = []
+        for source, values in snapshot["sources"].items():
+            for name, value in values.items():
+                rows.append([f"{source} · {name}", f"{value:.3f}" if isinstance(value, float) else str(value)])
+        self.fill_table(self.source_table, rows)
+
+        state = "enabled" if snapshot["enabled"] else "disabled"
+        self.elapsed_label.setText(f"{state} · {snapshot['elapsed']:.0f} s since reset")
+
+    @staticmethod
+    def fill_table(table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = table.item(row, column)
+                if item is None:
+                    table.setItem(row, column, QTableWidgetItem(value))
+                else:
+                    item.setText(value)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    app.aboutToQuit.connect(MqttService.shutdown_all)
+    app.aboutToQuit.connect(SessionRecorder.end_session)
+    show_window(HomeWindow)
+    sys.exit(app.exec_())
@@ -0,0 +1,248 @@
+import sys
+import time
+import random
+import argparse
+import tempfile
+import os
+import json
+import statistics
+import subprocess
+
+import Application
+from Application import SessionRecorder, ESP1_TOPIC_DATA, ESP2_TOPIC_DATA
+
+
+def synthetic_sample():
+    return {
+        "temperature": round(random.uniform(20, 30), 2),
+        "pressure": round(random.uniform(950, 1050), 2),
+        "humidity": round(random.uniform(30, 70), 2),
+    }
+
+
+def benchmark_recorder(rate, duration):
+    # Flux synthétique cadencé à `rate` messages/s vers un SessionRecorder
+    directory = tempfile.mkdtemp(prefix="coolingbrick_bench_")
+    path = os.path.join(directory, "session.jsonl")
+    recorder = SessionRecorder(path)
+    topics = [ESP1_TOPIC_DATA, ESP2_TOPIC_DATA]
+    samples = [synthetic_sample() for _ in range(1000)]
+
+    total = int(rate * duration)
+    start = time.perf_counter()
+    for index in range(total):
+        # Cadencement par paquets de 100 messages pour ne pas dépendre de la précision de sleep()
+        if index % 100 == 0:
+            delay = start + index / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        recorder.record(topics[index % 2], time.time(), samples[index % len(samples)])
+    feed_elapsed = time.perf_counter() - start
+    recorder.close()
+    elapsed = time.perf_counter() - start
+
+    stats = recorder.stats()
+    replayed = sum(1 for _ in SessionRecorder.replay(path))
+    size = os.path.getsize(path)
+    os.remove(path)
+    os.rmdir(directory)
+
+    print(f"Session recorder, synthetic feed at {rate} msg/s for {duration:.1f} s")
+    print(f"  offered:     {total} messages in {feed_elapsed:.2f} s ({total / feed_elapsed:.0f} msg/s)")
+    print(f"  written:     {stats['written']} messages in {elapsed:.2f} s ({stats['written'] / elapsed:.0f} msg/s)")
+    print(f"  dropped:     {stats['dropped']}")
+    print(f"  replayed:    {replayed}")
+    print(f"  file size:   {size / 1e6:.1f} MB ({size / max(stats['written'], 1):.0f} bytes/msg)")
+    print(f"  write latency: mean {stats['write_latency_ms_mean']:.2f} ms, max {stats['write_latency_ms_max']:.2f} ms")
+    return stats
+
+
+def percentile(values, fraction):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def benchmark_ingest(rates, duration, devices, metrics_path=None):
+    # Bout en bout : simulateurs ESP -> broker local -> MqttService -> fenêtre d'acquisition.
+    # La latence est mesurée entre l'envoi par le simulateur et l'affichage dans la fenêtre.
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QEventLoop, QTimer
+    from PyQt5.QtWidgets import QApplication
+    from Simulator import LocalBroker, start_simulators
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    if metrics_path:
+        Application.METRICS.enabled = True
+        metrics_path = os.path.abspath(metrics_path)
+    broker = LocalBroker(port=0).start()
+    Application.BROKER_ADDRESS = broker.host
+    Application.BROKER_PORT = broker.port
+
+    # Les fichiers de session du benchmark ne doivent pas polluer le répertoire courant
+    working_directory = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="coolingbrick_bench_"))
+
+    window = Application.AcquisitionWindowAfterBrick()
+    window.show()
+
+    received = []
+    latencies = []
+    frame_times = []
+
+    def measured_update(source, samples, update_data=window.update_data):
+        now = time.time()
+        received.append(len(samples))
+        latencies.extend(now - data["ts"] for _, data in samples if "ts" in data)
+        update_data(source, samples)
+
+    def measured_flush(flush=window.update_pump.flush):
+        flush()
+        frame_times.append(window.update_pump.frame_time)
+
+    window.update_data = measured_update
+    window.update_pump.timer.timeout.disconnect()
+    window.update_pump.timer.timeout.connect(measured_flush)
+
+    def run_event_loop(seconds):
+        loop = QEventLoop()
+        QTimer.singleShot(int(seconds * 1000), loop.quit)
+        loop.exec_()
+
+    print(f"End-to-end ingest, {devices} ESP1/ESP2 pair(s), {duration:.1f} s per step")
+    print(f"{'rate msg/s':>10} {'sent':>8} {'received':>9} {'dropped':>8} "
+          f"{'lat p50 ms':>11} {'lat p99 ms':>11} {'frame ms':>9} {'frame max':>10} {'fps':>6}")
+    results = []
+    for rate in rates:
+        # `rate` est le débit total de données ; il est réparti sur toutes les cartes
+        simulators = start_simulators(broker.host, broker.port, devices, rate / (2 * devices), timestamps=True)
+        run_event_loop(0.5)
+        received.clear()
+        latencies.clear()
+        frame_times.clear()
+
+        window.start_collecting()
+        run_event_loop(duration)
+        window.stop_collecting()
+        run_event_loop(1.0)
+
+        for simulator in simulators:
+            simulator.stop()
+        sent = sum(simulator.published for simulator in simulators)
+        total = sum(received)
+        result = {
+            "rate": rate,
+            "sent": sent,
+            "received": total,
+            "dropped": max(sent - total, 0),
+            "latency_p50_ms": 1000 * percentile(latencies, 0.5),
+            "latency_p99_ms": 1000 * percentile(latencies, 0.99),
+            "frame_ms": 1000 * sum(frame_times) / max(len(frame_times), 1),
+            "frame_max_ms": 1000 * max(frame_times, default=0.0),
+            "fps": window.update_pump.frame_rate,
+        }
+        results.append(result)
+        print(f"{rate:>10} {sent:>8} {total:>9} {result['dropped']:>8} "
+              f"{result['latency_p50_ms']:>11.1f} {result['latency_p99_ms']:>11.1f} "
+              f"{result['frame_ms']:>9.2f} {result['frame_max_ms']:>10.2f} {result['fps']:>6.1f}")
+        window.clear_data()
+
+    if metrics_path:
+        Application.METRICS.dump(metrics_path)
+        print(f"Metrics written to {metrics_path}")
+    window.close()
+    Application.MqttService.shutdown_all()
+    Application.SessionRecorder.end_session()
+    broker.stop()
+    os.chdir(working_directory)
+    return results
+
+
+# Exécuté dans un interpréteur neuf pour mesurer un vrai démarrage à froid
+STARTUP_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import Application
+imported = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+home = Application.show_window(Application.HomeWindow)
+app.processEvents()
+shown = time.perf_counter()
+shown_at = time.time()
+heavy_modules = [name for name in ("paho.mqtt.client", "PyQt5.QtChart", "reportlab.platypus") if name in sys.modules]
+
+# Première ouverture d'une fenêtre, puis retour vers une fenêtre déjà construite
+home.open_protocol_window()
+app.processEvents()
+opened = time.perf_counter()
+Application.show_window(Application.ProtocolWindow).open_home_window()
+app.processEvents()
+reopened = time.perf_counter()
+print(json.dumps({
+    "shown_at": shown_at,
+    "import_ms": 1000 * (imported - start),
+    "first_window_ms": 1000 * (shown - imported),
+    "open_window_ms": 1000 * (opened - shown),
+    "reopen_window_ms": 1000 * (reopened - opened),
+    "heavy_modules": heavy_modules,
+}))
+"""
+
+
+def benchmark_startup(runs):
+    # Temps entre le lancement du processus et l'affichage de la fenêtre d'accueil
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(runs):
+        launched_at = time.time()
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=directory, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["launch_to_window_ms"] = 1000 * (result.pop("shown_at") - launched_at)
+        results.append(result)
+
+    print(f"Application startup, median of {runs} cold runs")
+    for key, label in [("launch_to_window_ms", "launch -> home window"),
+                       ("import_ms", "import Application"),
+                       ("first_window_ms", "build + show HomeWindow"),
+                       ("open_window_ms", "first navigation"),
+                       ("reopen_window_ms", "back to reused window")]:
+        print(f"  {label:<24} {statistics.median(result[key] for result in results):8.1f} ms")
+    heavy_modules = sorted(set(name for result in results for name in result["heavy_modules"]))
+    print(f"  heavy modules at startup: {', '.join(heavy_modules) or 'none'}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks du banc de test")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    recorder_parser = subparsers.add_parser("recorder", help="Débit et latence du SessionRecorder")
+    recorder_parser.add_argument("--rate", type=int, default=10000, help="messages par seconde")
+    recorder_parser.add_argument("--duration", type=float, default=5.0, help="durée en secondes")
+
+    ingest_parser = subparsers.add_parser("ingest", help="Latence, pertes et temps d'image de bout en bout")
+    ingest_parser.add_argument("--rates", type=int, nargs="+", default=[10, 100, 500, 1000, 2000],
+                               help="débits totaux de données à tester (messages par seconde)")
+    ingest_parser.add_argument("--duration", type=float, default=5.0, help="durée de chaque palier en secondes")
+    ingest_parser.add_argument("--devices", type=int, default=1, help="nombre de paires ESP1/ESP2 simulées")
+    ingest_parser.add_argument("--metrics", metavar="PATH",
+                               help="active l'instrumentation et enregistre les métriques dans ce fichier")
+
+    startup_parser = subparsers.add_parser("startup", help="Temps d'affichage de la fenêtre d'accueil")
+    startup_parser.add_argument("--runs", type=int, default=5, help="nombre de lancements à froid")
+
+    args = parser.parse_args()
+    if args.benchmark == "startup":
+        results = benchmark_startup(args.runs)
+        # Un module lourd chargé au démarrage est une régression
+        sys.exit(1 if any(result["heavy_modules"] for result in results) else 0)
+    elif args.benchmark == "ingest":
+        benchmark_ingest(args.rates, args.duration, args.devices, args.metrics)
+    elif args.benchmark == "recorder":
+        stats = benchmark_recorder(args.rate, args.duration)
+        sys.exit(1 if stats["dropped"] else 0)
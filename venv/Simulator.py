@@ -0,0 +1,361 @@
+import sys
+import json
+import time
+import random
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+
+import paho.mqtt.client as mqtt
+
+from Application import (BROKER_PORT, ESP1_TOPIC_DATA, ESP2_TOPIC_DATA, ESP2_TOPIC_DATATEMP,
+                         ESP2_TOPIC_DATAFLOW, ESP2_TOPIC_COMMAND, ESP1_TOPIC_CONTROL,
+                         ESP2_TOPIC_CONTROL, SessionRecorder)
+
+
+# Types de paquets MQTT 3.1.1
+CONNECT, CONNACK, PUBLISH, PUBACK, PUBREC, PUBREL, PUBCOMP = 1, 2, 3, 4, 5, 6, 7
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK, PINGREQ, PINGRESP, DISCONNECT = 8, 9, 10, 11, 12, 13, 14
+
+
+def encode_packet(packet_type, flags, body):
+    header = bytearray([(packet_type << 4) | flags])
+    length = len(body)
+    while True:
+        byte = length % 128
+        length //= 128
+        header.append(byte | 0x80 if length else byte)
+        if not length:
+            break
+    return bytes(header) + body
+
+
+def encode_string(value):
+    data = value.encode('utf-8')
+    return struct.pack("!H", len(data)) + data
+
+
+class BrokerSession(socketserver.StreamRequestHandler):
+    # Une connexion client sur le LocalBroker
+    def setup(self):
+        super().setup()
+        self.subscriptions = {}     # filtre -> qos
+        self.send_lock = threading.Lock()
+        self.next_packet_id = 0
+
+    def send(self, packet):
+        with self.send_lock:
+            self.wfile.write(packet)
+
+    def read_packet(self):
+        first = self.rfile.read(1)
+        if not first:
+            return None, None, None
+        length, multiplier = 0, 1
+        while True:
+            byte = self.rfile.read(1)
+            if not byte:
+                return None, None, None
+            length += (byte[0] & 0x7F) * multiplier
+            multiplier *= 128
+            if not byte[0] & 0x80:
+                break
+        body = self.rfile.read(length) if length else b""
+        return first[0] >> 4, first[0] & 0x0F, body
+
+    def handle(self):
+        broker = self.server.broker
+        broker.add_session(self)
+        try:
+            while True:
+                packet_type, flags, body = self.read_packet()
+                if packet_type is None or packet_type == DISCONNECT:
+                    break
+                if packet_type == CONNECT:
+                    self.send(encode_packet(CONNACK, 0, b"\x00\x00"))
+                elif packet_type == PUBLISH:
+                    self.handle_publish(flags, body)
+                elif packet_type == PUBREL:
+                    self.send(encode_packet(PUBCOMP, 0, body[:2]))
+                elif packet_type == SUBSCRIBE:
+                    self.handle_subscribe(body)
+                elif packet_type == UNSUBSCRIBE:
+                    self.handle_unsubscribe(body)
+                elif packet_type == PINGREQ:
+                    self.send(encode_packet(PINGRESP, 0, b""))
+                # PUBACK, PUBREC et PUBCOMP des clients sont ignorés : pas de retransmission
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            broker.remove_session(self)
+
+    def handle_publish(self, flags, body):
+        qos = (flags >> 1) & 0x03
+        topic_length = struct.unpack("!H", body[:2])[0]
+        topic = body[2:2 + topic_length].decode('utf-8')
+        position = 2 + topic_length
+        if qos:
+            packet_id = body[position:position + 2]
+            position += 2
+            self.send(encode_packet(PUBACK if qos == 1 else PUBREC, 0, packet_id))
+        self.server.broker.route(topic, body[position:], qos)
+
+    def handle_subscribe(self, body):
+        packet_id, position = body[:2], 2
+        granted = bytearray()
+        while position < len(body):
+            length = struct.unpack("!H", body[position:position + 2])[0]
+            topic_filter = body[position + 2:position + 2 + length].decode('utf-8')
+            qos = min(body[position + 2 + length], 1)
+            position += 3 + length
+            self.subscriptions[topic_filter] = qos
+            granted.append(qos)
+        self.send(encode_packet(SUBACK, 0, packet_id + bytes(granted)))
+
+    def handle_unsubscribe(self, body):
+        packet_id, position = body[:2], 2
+        while position < len(body):
+            length = struct.unpack("!H", body[position:position + 2])[0]
+            self.subscriptions.pop(body[position + 2:position + 2 + length].decode('utf-8'), None)
+            position += 2 + length
+        self.send(encode_packet(UNSUBACK, 0, packet_id))
+
+    def deliver(self, topic, payload, qos):
+        for topic_filter, subscription_qos in list(self.subscriptions.items()):
+            if mqtt.topic_matches_sub(topic_filter, topic):
+                qos = min(qos, subscription_qos)
+                break
+        else:
+            return False
+        body = encode_string(topic)
+        if qos:
+            with self.send_lock:
+                self.next_packet_id = self.next_packet_id % 65535 + 1
+                packet_id = self.next_packet_id
+            body += struct.pack("!H", packet_id)
+        try:
+            self.send(encode_packet(PUBLISH, qos << 1, body + payload))
+        except OSError:
+            return False
+        return True
+
+
+class _BrokerServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class LocalBroker:
+    # Broker MQTT 3.1.1 minimal embarqué (QoS 0/1, sans rétention ni session persistante),
+    # suffisant pour faire tourner l'application et les simulateurs sans matériel
+    def __init__(self, host="127.0.0.1", port=BROKER_PORT):
+        self.server = _BrokerServer((host, port), BrokerSession)
+        self.server.broker = self
+        self.host, self.port = self.server.server_address
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.messages_in = 0
+        self.messages_out = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="LocalBroker", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with self.lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            try:
+                session.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def add_session(self, session):
+        with self.lock:
+            self.sessions.add(session)
+
+    def remove_session(self, session):
+        with self.lock:
+            self.sessions.discard(session)
+
+    def route(self, topic, payload, qos):
+        with self.lock:
+            sessions = list(self.sessions)
+            self.messages_in += 1
+        delivered = sum(session.deliver(topic, payload, qos) for session in sessions)
+        with self.lock:
+            self.messages_out += delivered
+
+
+class EspSimulator:
+    # Reproduit les messages publiés par les cartes de CodeESPArduino :
+    # ESP1 publie ESP1/data pendant l'acquisition ; ESP2 publie ESP2/temp et
+    # ESP2/flow en continu, ESP2/data pendant l'acquisition, et suit les
+    # consignes de température et de vent reçues sur ESP2/command.
+    DEFAULT_PERIODS = {"ESP1": 4.0, "ESP2": 2.0}
+
+    def __init__(self, name, host, port=BROKER_PORT, period=None, timestamps=False):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.period = period or self.DEFAULT_PERIODS[name]
+        # Ajoute l'heure d'envoi ("ts") aux données pour mesurer la latence de bout en bout
+        self.timestamps = timestamps
+
+        self.active = False
+        self.set_point = 0.0
+        self.wind_speed = 0.0
+        self.temperature = random.uniform(20, 23)
+        self.humidity = random.uniform(45, 55)
+        self.published = 0
+        self.running = False
+        self.thread = None
+
+        self.client = mqtt.Client()
+        self.client.on_connect = self.on_connect
+        self.client.on_message = self.on_message
+
+    def start(self):
+        self.running = True
+        self.client.connect(self.host, self.port, 60)
+        self.client.loop_start()
+        self.thread = threading.Thread(target=self.run, name=f"{self.name}Simulator", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+        self.client.disconnect()
+        self.client.loop_stop()
+
+    def on_connect(self, client, userdata, flags, rc):
+        if self.name == "ESP1":
+            client.subscribe(ESP1_TOPIC_CONTROL, 1)
+        else:
+            client.subscribe(ESP2_TOPIC_CONTROL, 1)
+            client.subscribe(ESP2_TOPIC_COMMAND, 1)
+
+    def on_message(self, client, userdata, msg):
+        message = msg.payload.decode().strip()
+        if msg.topic.endswith("/control"):
+            if message == "START":
+                self.active = True
+            elif message == "STOP":
+                self.active = False
+        elif msg.topic == ESP2_TOPIC_COMMAND:
+            try:
+                command = json.loads(message)
+            except json.JSONDecodeError:
+                return
+            self.set_point = float(command.get("temperature", self.set_point))
+            self.wind_speed = float(command.get("wind_speed", self.wind_speed))
+
+    def step(self):
+        # Modèle du premier ordre vers la consigne, plus un peu de bruit de mesure
+        if self.name == "ESP2" and self.set_point:
+            self.temperature += 0.1 * (self.set_point - self.temperature)
+        self.temperature += random.gauss(0, 0.05)
+        self.humidity = min(100.0, max(0.0, self.humidity + random.gauss(0, 0.2)))
+
+    def publish(self, topic, payload):
+        if self.timestamps:
+            payload["ts"] = time.time()
+        self.client.publish(topic, json.dumps(payload))
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while self.running:
+            self.step()
+            if self.name == "ESP2":
+                self.publish(ESP2_TOPIC_DATATEMP, {"temperature": round(self.temperature, 2)})
+                flow = self.wind_speed / 3.6 + random.gauss(0, 0.05)
+                self.publish(ESP2_TOPIC_DATAFLOW, {"flow": round(max(flow, 0.0), 2)})
+            if self.active:
+                # ESP1 est placé après la brique : l'air y est refroidi et humidifié
+                cooling = 3.0 if self.name == "ESP1" else 0.0
+                self.publish(ESP1_TOPIC_DATA if self.name == "ESP1" else ESP2_TOPIC_DATA, {
+                    "humidity": round(self.humidity + 2 * cooling, 2),
+                    "temperature": round(self.temperature - cooling, 2),
+                    "pressure": round(1013.25 + random.gauss(0, 0.3), 2),
+                })
+                self.published += 1
+
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -1.0:
+                # Trop en retard (débit demandé trop élevé) : on repart de maintenant
+                next_tick = time.perf_counter()
+
+
+def replay_session(path, host, port=BROKER_PORT, speed=1.0):
+    # Republie une session enregistrée par SessionRecorder en respectant ses écarts de temps
+    client = mqtt.Client()
+    client.connect(host, port, 60)
+    client.loop_start()
+    count = 0
+    start, first = time.perf_counter(), None
+    for record in SessionRecorder.replay(path):
+        if first is None:
+            first = record["t"]
+        if speed > 0:
+            delay = start + (record["t"] - first) / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        client.publish(record["topic"], json.dumps(record["data"]))
+        count += 1
+    client.disconnect()
+    client.loop_stop()
+    return count
+
+
+def start_simulators(host, port=BROKER_PORT, devices=1, rate=None, timestamps=False):
+    # `rate` : messages de données par seconde et par carte (cadence des ESP réelles par défaut)
+    period = 1.0 / rate if rate else None
+    simulators = []
+    for _ in range(devices):
+        for name in ("ESP1", "ESP2"):
+            simulators.append(EspSimulator(name, host, port, period, timestamps).start())
+    return simulators
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulateur des cartes ESP du banc de test")
+    parser.add_argument("--host", default="127.0.0.1", help="adresse du broker")
+    parser.add_argument("--port", type=int, default=BROKER_PORT, help="port du broker")
+    parser.add_argument("--no-broker", action="store_true", help="utiliser un broker existant au lieu du broker embarqué")
+    parser.add_argument("--devices", type=int, default=1, help="nombre de paires ESP1/ESP2 simulées")
+    parser.add_argument("--rate", type=float, default=None, help="messages par seconde et par carte")
+    parser.add_argument("--replay", default=None, help="fichier de session à rejouer")
+    parser.add_argument("--speed", type=float, default=1.0, help="vitesse de rejeu (0 = au plus vite)")
+    args = parser.parse_args()
+
+    broker = None
+    if not args.no_broker:
+        broker = LocalBroker(args.host, args.port).start()
+        print(f"Broker MQTT local sur {broker.host}:{broker.port}")
+
+    try:
+        if args.replay:
+            count = replay_session(args.replay, args.host, args.port, args.speed)
+            print(f"{count} messages rejoués depuis {args.replay}")
+        else:
+            simulators = start_simulators(args.host, args.port, args.devices, args.rate)
+            print(f"{len(simulators)} cartes simulées, Ctrl+C pour arrêter")
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if broker is not None:
+            broker.stop()
+    sys.exit(0)